@@ -0,0 +1,287 @@
+import os
+import json
+import time
+import logging
+import tarfile
+import zipfile
+import argparse
+import datetime
+import threading
+from itertools import islice
+
+import numpy as np
+
+from new_test import extract_text, load_results_and_ranks, PIPELINES, DEFAULT_MODE
+from extraction import extract_many, SUPPORTED_EXTENSIONS
+from screening import screen_resumes
+from result_cache import cache_stats
+from shortlist import resume_vectors, rank, SHORTLIST_TOP_N
+import metrics
+
+# Resumes extracted and screened together; bounds memory for very large folders
+CHUNK_SIZE = int(os.getenv('BATCH_CHUNK_SIZE', '64'))
+TOP_K = int(os.getenv('BATCH_TOP_K', '10'))
+
+
+def iter_folder(folder):
+    """
+    Yield (name, path) for every supported resume below `folder`, in a stable order.
+    """
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        for filename in sorted(files):
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, folder)
+            if filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                yield name, path
+            else:
+                print(f"Skipping unsupported file format: {name}")
+
+
+def iter_archive(archive):
+    """
+    Yield (name, (name, bytes)) for every supported resume in a zip or tar archive, one member at a time.
+    """
+    if zipfile.is_zipfile(archive):
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                if info.is_dir():
+                    continue
+                if not info.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                    print(f"Skipping unsupported file format: {info.filename}")
+                    continue
+                yield info.filename, (info.filename, zf.read(info))
+    else:
+        with tarfile.open(archive) as tf:
+            for member in tf:
+                if not member.isfile():
+                    continue
+                if not member.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                    print(f"Skipping unsupported file format: {member.name}")
+                    continue
+                yield member.name, (member.name, tf.extractfile(member).read())
+
+
+def iter_sources(path):
+    """
+    Yield (name, source) for the resumes of a folder or archive; `source` is what `extract_many` accepts.
+    """
+    if os.path.isdir(path):
+        return iter_folder(path)
+    if zipfile.is_zipfile(path) or tarfile.is_tarfile(path):
+        return iter_archive(path)
+    raise ValueError(f"{path} is neither a folder nor a zip or tar archive.")
+
+
+def read_checkpoint(output_path):
+    """
+    Return the names of resumes already screened successfully in an existing JSONL output.
+
+    Failed resumes are not included, so they are retried when the run is resumed.
+    """
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line may be cut short by a crash
+                continue
+            if record.get('error') is None:
+                done.add(record['resume_filename'])
+    return done
+
+
+def iter_output(output_path):
+    """
+    Yield the latest successful parser output of every resume in a JSONL output, tagged with its filename.
+    """
+    latest = {}
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get('error') is None and record.get('result'):
+                latest[record['resume_filename']] = record['result']
+    for filename, result in latest.items():
+        yield [dict(result[0], resume_filename=filename)]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def shortlist_sources(sources, job_description, top_n, chunk_size, on_error):
+    """
+    Return the names of the `top_n` resumes closest to the job description and the names left out.
+
+    Resumes are extracted and vectorized chunk by chunk, so only their vectors
+    are held in memory; `on_error(name, error)` is called for unreadable ones.
+    """
+    names, vectors = [], []
+    for chunk in chunked(sources, chunk_size):
+        texts = extract_many([source for _, source in chunk])
+        readable = []
+        for (name, _), text in zip(chunk, texts):
+            if isinstance(text, Exception):
+                on_error(name, text)
+                continue
+            readable.append((name, text))
+        if readable:
+            names += [name for name, _ in readable]
+            vectors.append(resume_vectors([text for _, text in readable]))
+    if len(names) <= top_n:
+        return set(names), []
+    picked = rank(np.concatenate(vectors), job_description, top_n)
+    selected = {names[index] for index in picked.selected}
+    print(f"Shortlisted {len(selected)} of {len(names)} resumes ({picked.backend})")
+    return selected, [name for name in names if name not in selected]
+
+
+def run_batch(source_path, job_description, output_path, workers=None, mode=None, chunk_size=None, top_n=None):
+    """
+    Screen every resume of a folder or archive and append one JSONL record per resume to `output_path`.
+
+    Resumes already screened in an existing output are skipped, so a crashed or
+    interrupted run continues where it stopped. With `top_n`, only the resumes
+    closest to the job description are screened and the others are recorded
+    as skipped. Returns the run statistics.
+    """
+    done = read_checkpoint(output_path)
+    if done:
+        print(f"Resuming: {len(done)} resumes already screened in {output_path}")
+
+    stats = {'screened': 0, 'failed': 0, 'skipped': len(done), 'not_shortlisted': 0, 'duplicates': 0,
+             'extract_seconds': 0.0, 'screen_seconds': 0.0}
+    outcomes = []
+    write_lock = threading.Lock()
+    started = time.perf_counter()
+
+    torn = False
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+
+    with open(output_path, 'a', encoding='utf-8') as out:
+        # Start on a fresh line if a crash left the last record cut short
+        if torn:
+            out.write("\n")
+
+        def write_record(filename, result, error, skipped=None, duplicate_of=None):
+            # Every finished resume is flushed right away, which is what makes the output a checkpoint
+            with write_lock:
+                record = {
+                    'resume_filename': filename,
+                    'result': result,
+                    'error': str(error) if error is not None else None,
+                }
+                if skipped:
+                    record['skipped'] = skipped
+                if duplicate_of:
+                    record['duplicate_of'] = duplicate_of
+                    stats['duplicates'] += 1
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+                if skipped:
+                    stats['not_shortlisted'] += 1
+                else:
+                    stats['screened' if error is None else 'failed'] += 1
+
+        pending = ((name, source) for name, source in iter_sources(source_path) if name not in done)
+        if top_n:
+            # A first pass ranks the whole pool; only the shortlist goes through the crew
+            extract_start = time.perf_counter()
+            selected, left_out = shortlist_sources(pending, job_description, top_n, chunk_size or CHUNK_SIZE,
+                                                   lambda name, error: write_record(name, None, error))
+            stats['extract_seconds'] += time.perf_counter() - extract_start
+            for name in left_out:
+                # Recorded without an error, so a resumed run does not screen them either
+                write_record(name, None, None, skipped=f"Not in the top {top_n} of the shortlist")
+            pending = ((name, source) for name, source in iter_sources(source_path) if name in selected)
+
+        for chunk in chunked(pending, chunk_size or CHUNK_SIZE):
+            extract_start = time.perf_counter()
+            texts = extract_many([source for _, source in chunk])
+            stats['extract_seconds'] += time.perf_counter() - extract_start
+
+            resumes = []
+            for (name, _), text in zip(chunk, texts):
+                if isinstance(text, Exception):
+                    write_record(name, None, text)
+                    continue
+                resumes.append((name, text))
+
+            def on_result(index, outcome):
+                # Near-duplicates in the chunk share one screening; the record names the resume screened
+                duplicate_of = resumes[outcome.duplicate_of][0] if outcome.duplicate_of is not None else None
+                write_record(outcome.filename, outcome.result, outcome.error, duplicate_of=duplicate_of)
+
+            screen_start = time.perf_counter()
+            chunk_outcomes = screen_resumes(resumes, job_description, max_workers=workers, on_result=on_result, mode=mode)
+            # Only the spans are kept for the metrics report; results are already on disk
+            outcomes.extend(outcome._replace(result=None) for outcome in chunk_outcomes)
+            stats['screen_seconds'] += time.perf_counter() - screen_start
+            os.fsync(out.fileno())
+
+            processed = stats['screened'] + stats['failed']
+            elapsed = time.perf_counter() - started
+            print(f"Processed {processed} resumes ({processed / elapsed:.2f}/s)")
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['metrics_path'] = metrics.write_run_report(
+        os.path.splitext(os.path.basename(output_path))[0], outcomes, path=f"{output_path}.metrics.json"
+    )
+    return stats
+
+
+def print_summary(stats):
+    processed = stats['screened'] + stats['failed']
+    seconds = stats['seconds']
+    print("\n📊 Batch summary:")
+    print(f"  Screened: {stats['screened']}  Failed: {stats['failed']}  Skipped (already done): {stats['skipped']}"
+          f"  Not shortlisted: {stats['not_shortlisted']}  Near-duplicates: {stats['duplicates']}")
+    print(f"  Wall time: {seconds:.1f}s  Throughput: {processed / seconds if seconds else 0:.2f} resumes/s")
+    print(f"  Extraction: {stats['extract_seconds']:.1f}s  Screening: {stats['screen_seconds']:.1f}s")
+    print(f"  Result cache: {cache_stats()}")
+    print(f"  Per-task timings and tokens: {stats['metrics_path']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch process resumes against a job description.')
+    parser.add_argument('--resumes_folder', type=str, required=True, help='Folder, zip or tar archive containing resumes')
+    parser.add_argument('--job_description', type=str, required=True, help='Path to the job description file')
+    parser.add_argument('--output', type=str, help='JSONL output file; an existing one is resumed (default: output_<timestamp>.jsonl)')
+    parser.add_argument('--workers', type=int, help='Resumes screened in parallel (default: SCREENING_MAX_WORKERS)')
+    parser.add_argument('--mode', type=str, choices=sorted(PIPELINES), default=DEFAULT_MODE, help='Screening pipeline')
+    parser.add_argument('--chunk_size', type=int, default=CHUNK_SIZE, help='Resumes extracted and screened per chunk')
+    parser.add_argument('--top', type=int, default=TOP_K, help='Number of top ranked candidates to print')
+    parser.add_argument('--shortlist', type=int, default=SHORTLIST_TOP_N,
+                        help='Screen only the N resumes closest to the job description (0: screen all)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    output_path = args.output or f"output_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    job_description_text = extract_text(args.job_description)
+
+    stats = run_batch(args.resumes_folder, job_description_text, output_path,
+                      workers=args.workers, mode=args.mode, chunk_size=args.chunk_size, top_n=args.shortlist)
+    print(f"\nResults written to {output_path}")
+    print_summary(stats)
+
+    # Load results and ranks
+    load_results_and_ranks(iter_output(output_path), top_k=args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+import sys
+import json
+import time
+import argparse
+import statistics
+
+from new_test import build_crew, build_fast_crew, build_llm
+from screening import kickoff_with_backoff, read_crew_result
+from benchmarks.stub_llm import StubLLM
+
+SAMPLE_JOB_PROFILE = (
+    "Required job title: Software Engineer\n"
+    "Required experience: 3-6 years\n"
+    "Required skills: Python, SQL, Docker, AWS\n"
+    "Required education: Bachelor's degree in Computer Science"
+)
+
+SAMPLE_CANDIDATES = [
+    ('Aarav Sharma', 'Software Engineer', 4, 'Python, SQL, Docker'),
+    ('Priya Nair', 'Data Analyst', 2, 'Excel, SQL, Tableau'),
+    ('Rahul Verma', 'Senior Software Engineer', 9, 'Java, Spring, AWS, Kubernetes'),
+    ('Sneha Reddy', 'Software Engineer', 3, 'Python, Flask, PostgreSQL'),
+    ('Vikram Singh', 'QA Engineer', 5, 'Selenium, Java, Jira'),
+    ('Ananya Iyer', 'Software Engineer Intern', 1, 'Python, Git'),
+    ('Karthik Rao', 'DevOps Engineer', 6, 'Docker, Terraform, AWS, Linux'),
+    ('Meera Pillai', 'Software Engineer', 5, 'Python, Django, AWS, SQL'),
+]
+
+
+def sample_resumes():
+    """
+    Return the fixed resume set used to compare screening modes.
+    """
+    resumes = []
+    for name, title, years, skills in SAMPLE_CANDIDATES:
+        resumes.append(
+            f"Name: {name}\n"
+            f"Email: {name.lower().replace(' ', '.')}@example.com\n"
+            f"Professional experience: {years} years\n"
+            f"Experience:\n{title}, Example Technologies (2019 - Present)\n"
+            f"- Delivered features used by thousands of customers.\n"
+            f"Education: B.Tech in Computer Science\n"
+            f"Skills: {skills}\n"
+        )
+    return resumes
+
+
+def run_mode(builder, llm, resumes, job_profile):
+    """
+    Screen every resume sequentially with one crew and collect latency, tokens and records.
+    """
+    crew = builder(llm)
+    latencies = []
+    records = []
+    live_tokens = {'prompt_tokens': 0, 'completion_tokens': 0}
+    for resume in resumes:
+        start = time.perf_counter()
+        output = kickoff_with_backoff(crew, {"resume": resume, "job_profile": job_profile})
+        latencies.append(time.perf_counter() - start)
+        usage = getattr(output, 'token_usage', None)
+        if usage is not None:
+            live_tokens['prompt_tokens'] += usage.prompt_tokens
+            live_tokens['completion_tokens'] += usage.completion_tokens
+        try:
+            records.append(read_crew_result(crew)[0])
+        except (ValueError, IndexError, KeyError) as e:
+            print(f"⚠️ Failed to parse output: {e}", file=sys.stderr)
+            records.append(None)
+
+    tokens = llm.usage() if isinstance(llm, StubLLM) else live_tokens
+    return {
+        'resumes': len(resumes),
+        'total_seconds': round(sum(latencies), 4),
+        'mean_latency_seconds': round(statistics.mean(latencies), 4),
+        'p95_latency_seconds': round(sorted(latencies)[int(0.95 * (len(latencies) - 1))], 4),
+        'tokens': tokens,
+        'records': records,
+    }
+
+
+def agreement(full_records, fast_records):
+    """
+    Compare the scores and tags the two modes gave to the same resumes.
+    """
+    pairs = [(a, b) for a, b in zip(full_records, fast_records) if a and b]
+    if not pairs:
+        return {'compared': 0}
+    diffs = [abs(int(a['overall_score']) - int(b['overall_score'])) for a, b in pairs]
+    return {
+        'compared': len(pairs),
+        'mean_abs_score_diff': round(statistics.mean(diffs), 2),
+        'max_abs_score_diff': max(diffs),
+        'tag_agreement': round(sum(a['tag'] == b['tag'] for a, b in pairs) / len(pairs), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the full and fast screening modes on a fixed resume set.')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated seconds per stub LLM call')
+    parser.add_argument('--live', action='store_true', help='Use the real OpenAI model instead of the stub')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    resumes = sample_resumes()
+    report = {'mode': 'live' if args.live else 'stub', 'stub_latency_seconds': args.latency}
+    for mode, builder in (('full', build_crew), ('fast', build_fast_crew)):
+        llm = build_llm() if args.live else StubLLM(latency=args.latency)
+        report[mode] = run_mode(builder, llm, resumes, SAMPLE_JOB_PROFILE)
+    report['agreement'] = agreement(report['full']['records'], report['fast']['records'])
+    report['speedup'] = round(report['full']['total_seconds'] / max(report['fast']['total_seconds'], 1e-9), 2)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
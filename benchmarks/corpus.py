@@ -0,0 +1,138 @@
+import os
+import random
+import argparse
+
+import fitz
+from docx import Document
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Sneha', 'Vikram', 'Ananya', 'Karthik', 'Meera', 'Arjun', 'Divya']
+LAST_NAMES = ['Sharma', 'Nair', 'Verma', 'Reddy', 'Singh', 'Iyer', 'Rao', 'Pillai', 'Gupta', 'Menon']
+TITLES = ['Software Engineer', 'Senior Software Engineer', 'Data Analyst', 'Data Scientist',
+          'QA Engineer', 'DevOps Engineer', 'Product Manager', 'Frontend Developer']
+SKILLS = ['Python', 'Java', 'SQL', 'Docker', 'AWS', 'Kubernetes', 'React', 'Django', 'Spark',
+          'Tableau', 'Terraform', 'Selenium', 'PostgreSQL', 'Git', 'Linux']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Systems', 'Hooli', 'Stark Industries']
+
+JOB_DESCRIPTION = (
+    "Job Title: Software Engineer\n"
+    "Location: Hyderabad\n"
+    "Experience: 3-6 years\n"
+    "We are looking for a Software Engineer to build and run our hiring platform.\n"
+    "Requirements:\n"
+    "• Python, SQL, Docker and AWS\n"
+    "• Experience with REST APIs and CI/CD\n"
+    "Education: Bachelor's degree in Computer Science or a related field.\n"
+)
+
+
+def resume_text(seed, pages=1):
+    """
+    Build a deterministic synthetic resume; `pages` repeats the experience section to grow it.
+    """
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    years = rng.randint(0, 12)
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}{seed}@example.com | +91 98{seed % 100000000:08d}",
+        f"Professional summary: {rng.choice(TITLES)} with {years} years of experience.",
+        "",
+        "Experience",
+    ]
+    start = 2024 - years
+    for page in range(pages):
+        for _ in range(3):
+            end = min(2024, start + rng.randint(1, 3))
+            lines.append(f"{rng.choice(TITLES)}, {rng.choice(COMPANIES)} ({start} - {end if end < 2024 else 'Present'})")
+            for _ in range(4):
+                lines.append(f"- Delivered {rng.choice(SKILLS)} work that improved throughput by {rng.randint(5, 60)}%.")
+            start = end
+        lines.append("")
+    lines += [
+        "Education",
+        "B.Tech in Computer Science, Example University (2012)",
+        "",
+        "Skills",
+        ", ".join(rng.sample(SKILLS, 6)),
+    ]
+    return "\n".join(lines)
+
+
+def resume_variant(text, seed):
+    """
+    Return a slightly edited copy of a resume, like a candidate re-applying with an updated CV.
+    """
+    rng = random.Random(seed)
+    lines = text.split('\n')
+    bullets = [index for index, line in enumerate(lines) if line.startswith('- ')]
+    if bullets:
+        index = rng.choice(bullets)
+        lines[index] = lines[index].replace('Delivered', rng.choice(['Led', 'Owned', 'Shipped']), 1)
+    lines.insert(3, rng.choice(['Notice period: 30 days.', 'Open to relocation.', 'Available immediately.']))
+    # Extracted from another format: different spacing and bullets
+    return '\n'.join(line.replace('- ', '• ', 1) + ('  ' if index % 2 else '') for index, line in enumerate(lines))
+
+
+def write_txt(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def write_pdf(path, text, lines_per_page=45):
+    doc = fitz.open()
+    lines = text.split('\n')
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((50, 50), '\n'.join(lines[start:start + lines_per_page]), fontsize=10)
+    doc.save(path)
+    doc.close()
+
+
+def write_docx(path, text):
+    doc = Document()
+    lines = text.split('\n')
+    doc.sections[0].header.paragraphs[0].text = lines[0]
+    for line in lines[1:]:
+        doc.add_paragraph(line)
+    table = doc.add_table(rows=2, cols=2)
+    table.cell(0, 0).text = 'Certification'
+    table.cell(0, 1).text = 'Year'
+    table.cell(1, 0).text = 'AWS Certified Developer'
+    table.cell(1, 1).text = '2021'
+    doc.save(path)
+
+
+WRITERS = {'pdf': write_pdf, 'docx': write_docx, 'txt': write_txt}
+
+
+def generate_corpus(folder, count, formats=('pdf', 'docx', 'txt'), pages=1, seed=0):
+    """
+    Write `count` synthetic resumes (cycling through `formats`) plus a job description into `folder`.
+
+    Returns the list of resume paths.
+    """
+    os.makedirs(folder, exist_ok=True)
+    write_txt(os.path.join(folder, 'job_description.txt'), JOB_DESCRIPTION)
+    paths = []
+    for i in range(count):
+        fmt = formats[i % len(formats)]
+        path = os.path.join(folder, f"resume_{i:05d}.{fmt}")
+        WRITERS[fmt](path, resume_text(seed + i, pages=pages))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic resume corpus.')
+    parser.add_argument('folder', type=str, help='Output folder')
+    parser.add_argument('--count', type=int, default=100, help='Number of resumes')
+    parser.add_argument('--formats', type=str, default='pdf,docx,txt', help='Comma separated formats')
+    parser.add_argument('--pages', type=int, default=1, help='Experience sections per resume')
+    args = parser.parse_args()
+
+    paths = generate_corpus(args.folder, args.count, tuple(args.formats.split(',')), args.pages)
+    print(f"Wrote {len(paths)} resumes to {args.folder}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from sqlalchemy import text
+
+import db
+
+
+def sample_records(count):
+    return [{
+        'candidate_name': f"Candidate {i}",
+        'overall_score': i % 100,
+        'tag': 'QUALIFIED' if i % 100 >= 70 else 'NOT QUALIFIED',
+        'explanation': f"Explanation for candidate {i}. " * 4,
+        'feedback': f"Feedback for candidate {i}.",
+    } for i in range(count)]
+
+
+RUN_ID = 'benchmark'
+
+
+def row_by_row(records):
+    # The previous approach: one INSERT statement per result
+    with db.get_engine().begin() as conn:
+        for record in records:
+            conn.execute(db.hr_resume_results.insert(), db._row(record, RUN_ID))
+    return len(records)
+
+
+def bulk_insert(records):
+    return db.insert_results(records, RUN_ID)
+
+
+def upsert_twice(records):
+    # Publish every result, then write all of them again as a re-run would
+    keyed = [(f"{RUN_ID}:{i}", record) for i, record in enumerate(records)]
+    db.upsert_results(RUN_ID, keyed)
+    return db.upsert_results(RUN_ID, keyed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark writes to hr_resume_results.')
+    parser.add_argument('--rows', type=int, default=10000, help='Number of result rows')
+    parser.add_argument('--database-url', type=str, help='Database to write to (default: a temporary SQLite file)')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='hr_db_'), 'results.sqlite3')
+    records = sample_records(args.rows)
+
+    report = {'rows': args.rows, 'dialect': db.get_engine().dialect.name}
+    for label, write in (('row_by_row', row_by_row), ('bulk_insert', bulk_insert), ('upsert', upsert_twice)):
+        db.delete_run(RUN_ID)
+        start = time.perf_counter()
+        write(records)
+        seconds = time.perf_counter() - start
+        with db.get_engine().connect() as conn:
+            stored = conn.execute(text("SELECT COUNT(*) FROM hr_resume_results")).scalar()
+        start = time.perf_counter()
+        db.fetch_results(RUN_ID)
+        report[label] = {
+            'seconds': round(seconds, 4),
+            'rows_per_sec': round(args.rows / seconds, 1),
+            'stored': stored,
+            'fetch_seconds': round(time.perf_counter() - start, 4),
+        }
+    db.delete_run(RUN_ID)
+    db.dispose_engine()
+
+    result = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(result)
+    print(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import tempfile
+
+import fitz
+
+import extraction
+from benchmarks.corpus import generate_corpus
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process and of its finished children, in MB.
+    """
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return round(own, 1), round(children, 1)
+
+
+def count_pages(paths):
+    pages = 0
+    for path in paths:
+        if path.endswith('.pdf'):
+            with fitz.open(path) as doc:
+                pages += min(len(doc), extraction.MAX_PAGES)
+        else:
+            pages += 1
+    return pages
+
+
+def run(paths, parallel):
+    start = time.perf_counter()
+    if parallel:
+        texts = extraction.extract_many(paths)
+    else:
+        texts = [extraction.extract_text(path) for path in paths]
+    seconds = time.perf_counter() - start
+    errors = sum(isinstance(text, Exception) for text in texts)
+    chars = sum(len(text) for text in texts if not isinstance(text, Exception))
+    return seconds, errors, chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark resume text extraction.')
+    parser.add_argument('--count', type=int, default=150, help='Number of generated resumes')
+    parser.add_argument('--pages', type=int, default=4, help='Experience sections per resume')
+    parser.add_argument('--corpus', type=str, help='Existing corpus folder to reuse')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    folder = args.corpus or tempfile.mkdtemp(prefix='hr_corpus_')
+    if args.corpus and os.path.isdir(folder):
+        paths = sorted(
+            os.path.join(folder, name) for name in os.listdir(folder)
+            if name.startswith('resume_') and name.lower().endswith(extraction.SUPPORTED_EXTENSIONS)
+        )
+    else:
+        paths = generate_corpus(folder, args.count, pages=args.pages)
+    pages = count_pages(paths)
+
+    report = {'files': len(paths), 'pages': pages, 'workers': extraction.EXTRACT_WORKERS}
+    for label, parallel in (('sequential', False), ('process_pool', True)):
+        # Warm the pool up so its start-up cost is not counted as extraction time
+        if parallel:
+            extraction.extract_many(paths[:2])
+        seconds, errors, chars = run(paths, parallel)
+        report[label] = {
+            'seconds': round(seconds, 4),
+            'files_per_sec': round(len(paths) / seconds, 1),
+            'pages_per_sec': round(pages / seconds, 1),
+            'chars': chars,
+            'errors': errors,
+        }
+    extraction.shutdown_pool()
+    report['peak_rss_mb'], report['peak_worker_rss_mb'] = peak_rss_mb()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
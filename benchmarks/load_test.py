@@ -0,0 +1,177 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.offline import OFFLINE_ENV
+from benchmarks.run import latency_stats
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUN_ID = 'loadtest'
+
+
+def server_env(data_dir, workers, threads):
+    env = dict(os.environ, **OFFLINE_ENV)
+    env.update({
+        'HR_DATA_DIR': data_dir,
+        'DATABASE_URL': 'sqlite:///' + os.path.join(data_dir, 'results.sqlite3'),
+        'OPENAI_API_KEY': os.getenv('OPENAI_API_KEY', 'sk-offline-benchmark'),
+        'LOG_LEVEL': 'WARNING',
+        'GUNICORN_ACCESS_LOG': '/dev/null',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_THREADS': str(threads),
+    })
+    return env
+
+
+def seed_results(env, rows):
+    """
+    Publish `rows` screening results under RUN_ID so /results has a realistic page to render.
+    """
+    os.environ.update({'HR_DATA_DIR': env['HR_DATA_DIR'], 'DATABASE_URL': env['DATABASE_URL']})
+    import db
+    from benchmarks.db_insert import sample_records
+
+    db.start_run(RUN_ID, 'full')
+    db.insert_results(sample_records(rows), RUN_ID)
+    db.finish_run(RUN_ID)
+    db.dispose_engine()
+
+
+def start_server(kind, port, env):
+    if kind == 'gunicorn':
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{port}', 'main_test:app']
+    else:
+        # Flask's development server, as `python main_test.py` runs it
+        command = [sys.executable, 'main_test.py']
+        env = dict(env, PORT=str(port))
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def request(conn, path):
+    conn.request('GET', path)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def wait_until_ready(url, timeout=120, in_a_row=10):
+    """
+    Poll /readyz until it succeeds `in_a_row` times, so every worker has built its pipelines.
+    """
+    parts = urlsplit(url)
+    deadline = time.time() + timeout
+    successes = 0
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=5)
+            successes = successes + 1 if request(conn, '/readyz') == 200 else 0
+            conn.close()
+        except OSError:
+            successes = 0
+        if successes >= in_a_row:
+            return
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout}s")
+
+
+def client(url, path, duration):
+    # One keep-alive connection sending requests back to back
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    latencies, errors, reconnects = [], Counter(), 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            status = request(conn, path)
+        except http.client.RemoteDisconnected:
+            # The server closed the idle keep-alive connection (e.g. a recycled worker); retry like a browser would
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+            reconnects += 1
+            continue
+        except (OSError, http.client.HTTPException) as e:
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+            status = type(e).__name__
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            errors[str(status)] += 1
+    conn.close()
+    return latencies, errors, reconnects
+
+
+def load(url, path, concurrency, duration):
+    with ProcessPoolExecutor(max_workers=concurrency) as pool:
+        runs = list(pool.map(client, [url] * concurrency, [path] * concurrency, [duration] * concurrency))
+    latencies = [seconds for run, _, _ in runs for seconds in run]
+    errors = sum((errors for _, errors, _ in runs), Counter())
+    return {
+        'requests': len(latencies),
+        'errors': sum(errors.values()),
+        'error_kinds': dict(errors),
+        'reconnects': sum(reconnects for _, _, reconnects in runs),
+        'requests_per_sec': round(len(latencies) / duration, 1),
+        **latency_stats(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure requests/sec of / and /results under concurrent load.')
+    parser.add_argument('--url', type=str, help='Load an already running server instead of starting one')
+    parser.add_argument('--run_id', type=str, help='Screening run shown by /results (default: a seeded run)')
+    parser.add_argument('--server', type=str, choices=('gunicorn', 'dev'), default='gunicorn', help='Server started when --url is not given')
+    parser.add_argument('--workers', type=int, default=4, help='gunicorn worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='Threads per gunicorn worker')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--rows', type=int, default=500, help='Results seeded for /results')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent client connections')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds of load per endpoint')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    run_id = args.run_id
+    if not url:
+        env = server_env(tempfile.mkdtemp(prefix='hr_load_'), args.workers, args.threads)
+        if not run_id:
+            seed_results(env, args.rows)
+            run_id = RUN_ID
+        server = start_server(args.server, args.port, env)
+        url = f"http://127.0.0.1:{args.port}"
+
+    report = {
+        'url': url,
+        'server': args.server if server else 'external',
+        'parameters': {'workers': args.workers, 'threads': args.threads, 'concurrency': args.concurrency,
+                       'duration': args.duration, 'rows': args.rows},
+        'endpoints': {},
+    }
+    try:
+        wait_until_ready(url)
+        paths = {'/': '/', '/results': f'/results?run_id={run_id}' if run_id else '/results'}
+        for name, path in paths.items():
+            report['endpoints'][name] = load(url, path, args.concurrency, args.duration)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
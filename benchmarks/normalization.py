@@ -0,0 +1,101 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+
+from normalization import prepare_resume, TOKEN_BUDGET
+from benchmarks.corpus import resume_text
+
+
+def paginated(text, lines_per_page=45):
+    """
+    Add a running header with the name and a page footer to every page of a resume, as CV templates do.
+    """
+    lines = text.split('\n')
+    pages = [lines[start:start + lines_per_page] for start in range(0, len(lines), lines_per_page)]
+    out = []
+    for number, page in enumerate(pages, 1):
+        out += [f"{lines[0]}   |   Curriculum Vitae", "   "] + page + ["", f"Page {number} of {len(pages)}"]
+    return '\n'.join(out)
+
+
+def generated_resumes(count, pages, formats=('pdf', 'docx')):
+    """
+    Write generated resumes as PDF and DOCX files and yield (name, text) as `extract_text` reads them back.
+    """
+    from extraction import extract_text
+    from benchmarks.corpus import write_pdf, write_docx
+
+    with tempfile.TemporaryDirectory(prefix='hr_norm_') as folder:
+        for seed in range(count):
+            fmt = formats[seed % len(formats)]
+            path = os.path.join(folder, f"resume_{seed:05d}.{fmt}")
+            text = resume_text(seed, pages=pages)
+            if fmt == 'pdf':
+                # Every PDF page carries the header and footer lines
+                write_pdf(path, paginated(text), lines_per_page=49)
+            else:
+                write_docx(path, text)
+            yield os.path.basename(path), extract_text(path)
+
+
+def folder_resumes(folder):
+    from extraction import extract_many, SUPPORTED_EXTENSIONS
+    names = sorted(name for name in os.listdir(folder) if name.lower().endswith(SUPPORTED_EXTENSIONS))
+    for name, text in zip(names, extract_many([os.path.join(folder, name) for name in names])):
+        if not isinstance(text, Exception):
+            yield name, text
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the resume tokens saved by normalization, per resume.')
+    parser.add_argument('--folder', type=str, help='Folder of real resumes (default: generated ones)')
+    parser.add_argument('--count', type=int, default=20, help='Number of generated resumes (PDF and DOCX in turn)')
+    parser.add_argument('--pages', type=int, default=30, help='Experience sections per generated resume')
+    parser.add_argument('--budget', type=int, default=TOKEN_BUDGET, help='Resume token budget')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    resumes = folder_resumes(args.folder) if args.folder else generated_resumes(args.count, args.pages)
+    rows = []
+    seconds = 0.0
+    for name, text in resumes:
+        start = time.perf_counter()
+        prepared = prepare_resume(text, budget=args.budget)
+        seconds += time.perf_counter() - start
+        rows.append({
+            'resume': name,
+            'original_tokens': prepared.original_tokens,
+            'prompt_tokens': prepared.tokens,
+            'saved_tokens': prepared.original_tokens - prepared.tokens,
+            'saved_percent': round(100 * (1 - prepared.tokens / prepared.original_tokens), 1) if prepared.original_tokens else 0.0,
+            'truncated': prepared.truncated,
+            'sections': prepared.sections,
+        })
+
+    original = sum(row['original_tokens'] for row in rows)
+    prompt = sum(row['prompt_tokens'] for row in rows)
+    report = {
+        'budget': args.budget,
+        'resumes': len(rows),
+        'original_tokens': original,
+        'prompt_tokens': prompt,
+        'saved_percent': round(100 * (1 - prompt / original), 1) if original else 0.0,
+        'truncated': sum(row['truncated'] for row in rows),
+        'ms_per_resume': round(1000 * seconds / len(rows), 2) if rows else 0.0,
+        'per_resume': rows,
+    }
+
+    for row in rows:
+        print(f"{row['resume']}: {row['original_tokens']} -> {row['prompt_tokens']} tokens "
+              f"({row['saved_percent']}% saved{', truncated' if row['truncated'] else ''})")
+    print(f"Total: {original} -> {prompt} tokens ({report['saved_percent']}% saved), "
+          f"{report['ms_per_resume']} ms per resume")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+# Settings the benchmarks need before any project module reads its configuration at import time
+OFFLINE_ENV = {
+    'CREWAI_DISABLE_TELEMETRY': 'true',
+    'OTEL_SDK_DISABLED': 'true',
+    'CREW_VERBOSE': 'false',
+    'RESULT_CACHE_ENABLED': 'false',
+    'PREFILTER_ENABLED': 'false',
+    'JOB_POLL_INTERVAL': '0.05',
+}
+
+
+def setup(latency=0.0, data_dir=None, cache=False, prefilter=False):
+    """
+    Point the screening pipeline at a stub LLM and throwaway local storage, and return the data directory.
+
+    Local state (queue, caches, JD store) and the results database (a SQLite
+    file standing in for MySQL) all live in `data_dir`. Result caching and the
+    pre-filter rules are off by default so every resume reaches the crew.
+    Must run before the project modules are imported.
+    """
+    data_dir = data_dir or tempfile.mkdtemp(prefix='hr_bench_')
+    os.environ.update(OFFLINE_ENV)
+    os.environ['RESULT_CACHE_ENABLED'] = 'true' if cache else 'false'
+    os.environ['PREFILTER_ENABLED'] = 'true' if prefilter else 'false'
+    os.environ['HR_DATA_DIR'] = data_dir
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(data_dir, 'results.sqlite3')
+    # Nothing reaches OpenAI, but the client settings expect a key to exist
+    os.environ.setdefault('OPENAI_API_KEY', 'sk-offline-benchmark')
+
+    import new_test
+    from benchmarks.stub_llm import StubLLM
+
+    # Every crew built from now on (one per screening thread) gets its own stub
+    new_test.build_llm = lambda: StubLLM(latency=latency)
+    return data_dir
@@ -0,0 +1,406 @@
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import statistics
+import tempfile
+import subprocess
+import tracemalloc
+
+from benchmarks import offline
+
+SCENARIOS = ('single_resume', 'throughput', 'memory', 'end_to_end', 'extraction', 'db_insert', 'shortlist', 'dedupe')
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[int(fraction * (len(ordered) - 1))]
+
+
+def latency_stats(seconds):
+    return {
+        'mean_seconds': round(statistics.mean(seconds), 4),
+        'p50_seconds': round(percentile(seconds, 0.5), 4),
+        'p95_seconds': round(percentile(seconds, 0.95), 4),
+        'max_seconds': round(max(seconds), 4),
+    }
+
+
+def corpus_texts(count, seed=0, pages=1):
+    from benchmarks.corpus import resume_text
+    return [(f"resume_{seed + i:05d}.txt", resume_text(seed + i, pages=pages)) for i in range(count)]
+
+
+def span_tokens(spans):
+    tasks = [task for span in spans for task in span['tasks'] if not task['skipped']]
+    return {
+        'prompt_tokens': sum(task['prompt_tokens'] for task in tasks),
+        'completion_tokens': sum(task['completion_tokens'] for task in tasks),
+        'llm_requests': sum(task['requests'] for task in tasks),
+    }
+
+
+def scenario_single_resume(args, modes):
+    """
+    Latency of screening one resume at a time, per pipeline mode.
+    """
+    from screening import screen_resume_traced
+    from benchmarks.corpus import JOB_DESCRIPTION
+
+    report = {}
+    for mode in modes:
+        # The first screening on a thread builds its crew; keep that out of the samples
+        screen_resume_traced(corpus_texts(1, seed=10**6)[0][1], JOB_DESCRIPTION, mode)
+        spans = []
+        for _, text in corpus_texts(args.samples):
+            spans.append(screen_resume_traced(text, JOB_DESCRIPTION, mode)[1])
+        tokens = span_tokens(spans)
+        report[mode] = dict(
+            latency_stats([span['seconds'] for span in spans]),
+            samples=len(spans),
+            prompt_tokens_per_resume=round(tokens['prompt_tokens'] / len(spans), 1),
+            completion_tokens_per_resume=round(tokens['completion_tokens'] / len(spans), 1),
+            llm_requests_per_resume=round(tokens['llm_requests'] / len(spans), 2),
+        )
+    return report
+
+
+def scenario_throughput(args, modes):
+    """
+    Batch throughput of screen_resumes, publishing each result to the database, at several concurrency levels.
+    """
+    import db
+    from screening import screen_resumes
+    from benchmarks.corpus import JOB_DESCRIPTION
+
+    report = {}
+    for mode in modes:
+        levels = {}
+        for workers in args.concurrency:
+            run_id = f"bench-{mode}-{workers}"
+            resumes = corpus_texts(args.count, seed=workers * 10**5)
+            db.start_run(run_id, mode)
+
+            def on_result(index, outcome):
+                if outcome.error is None:
+                    db.upsert_results(run_id, [(f"{run_id}:{index}", outcome.result)])
+
+            start = time.perf_counter()
+            outcomes = screen_resumes(resumes, JOB_DESCRIPTION, max_workers=workers, on_result=on_result, mode=mode)
+            seconds = time.perf_counter() - start
+            db.finish_run(run_id)
+            levels[str(workers)] = {
+                'resumes': len(resumes),
+                'errors': sum(outcome.error is not None for outcome in outcomes),
+                'seconds': round(seconds, 4),
+                'resumes_per_sec': round(len(resumes) / seconds, 2),
+            }
+        base = levels[str(args.concurrency[0])]['resumes_per_sec']
+        for level in levels.values():
+            level['speedup'] = round(level['resumes_per_sec'] / base, 2)
+        report[mode] = levels
+    return report
+
+
+def scenario_memory(args, modes):
+    """
+    Python heap allocated per resume while a batch is screened (tracemalloc peak, marginal per resume).
+    """
+    from screening import screen_resumes
+    from benchmarks.corpus import JOB_DESCRIPTION
+
+    def peak_bytes(resumes, workers):
+        tracemalloc.start()
+        screen_resumes(resumes, JOB_DESCRIPTION, max_workers=workers, mode=mode)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    report = {}
+    workers = max(args.concurrency)
+    for mode in modes:
+        # Crews are built before measuring so only per-resume allocations are counted
+        screen_resumes(corpus_texts(workers, seed=2 * 10**6), JOB_DESCRIPTION, max_workers=workers, mode=mode)
+        single = peak_bytes(corpus_texts(1, seed=3 * 10**6), 1)
+        batch = peak_bytes(corpus_texts(args.count, seed=4 * 10**6, pages=args.pages), workers)
+        report[mode] = {
+            'workers': workers,
+            'resumes': args.count,
+            'single_resume_peak_bytes': single,
+            'batch_peak_bytes': batch,
+            'per_resume_bytes': round((batch - single) / max(args.count - 1, 1)),
+        }
+    return report
+
+
+def scenario_end_to_end(args, modes):
+    """
+    Upload through home(), queue, background screening and result publishing, via the Flask test client.
+    """
+    import main_test
+    import job_queue
+    from benchmarks.corpus import JOB_DESCRIPTION, resume_text, write_pdf, write_docx
+
+    folder = tempfile.mkdtemp(prefix='hr_bench_uploads_')
+    writers = {'pdf': write_pdf, 'docx': write_docx}
+    uploads = []
+    for i in range(args.count):
+        fmt = ('pdf', 'docx', 'txt')[i % 3]
+        text = resume_text(5 * 10**6 + i)
+        if fmt == 'txt':
+            data = text.encode('utf-8')
+        else:
+            path = os.path.join(folder, f"resume_{i}.{fmt}")
+            writers[fmt](path, text)
+            with open(path, 'rb') as f:
+                data = f.read()
+        uploads.append((data, f"resume_{i}.{fmt}"))
+
+    client = main_test.app.test_client()
+    report = {}
+    for mode in modes:
+        start = time.perf_counter()
+        response = client.post('/', data={
+            'mode': mode,
+            'job_desc': (io.BytesIO(JOB_DESCRIPTION.encode('utf-8')), 'job_description.txt'),
+            'resumes': [(io.BytesIO(data), name) for data, name in uploads],
+        }, content_type='multipart/form-data', headers={'Accept': 'application/json'})
+        accepted = time.perf_counter() - start
+        job_id = response.get_json()['job_id']
+        submitted_at = time.time() - accepted
+
+        while True:
+            status = job_queue.get_job_summary(job_id)
+            if status['status'] in ('done', 'failed'):
+                break
+            time.sleep(0.05)
+        seconds = time.perf_counter() - start
+        finished = job_queue.finished_items(job_id)
+        first_result = min(item['finished_at'] for item in finished) - submitted_at if finished else None
+        report[mode] = {
+            'resumes': args.count,
+            'status': status['status'],
+            'failed': status['failed'],
+            'request_seconds': round(accepted, 4),
+            'time_to_first_result_seconds': round(first_result, 4) if first_result is not None else None,
+            'seconds': round(seconds, 4),
+            'resumes_per_sec': round(args.count / seconds, 2),
+        }
+    return report
+
+
+def scenario_extraction(args, modes):
+    """
+    Text extraction throughput, sequential and in the process pool.
+    """
+    import extraction
+    from benchmarks.corpus import generate_corpus
+    from benchmarks.extraction import count_pages, run
+
+    paths = generate_corpus(tempfile.mkdtemp(prefix='hr_bench_corpus_'), args.count, pages=args.pages)
+    pages = count_pages(paths)
+    report = {'files': len(paths), 'pages': pages, 'workers': extraction.EXTRACT_WORKERS}
+    for label, parallel in (('sequential', False), ('process_pool', True)):
+        if parallel:
+            extraction.extract_many(paths[:2])
+        seconds, errors, _ = run(paths, parallel)
+        report[label] = {
+            'seconds': round(seconds, 4),
+            'files_per_sec': round(len(paths) / seconds, 1),
+            'pages_per_sec': round(pages / seconds, 1),
+            'errors': errors,
+        }
+    extraction.shutdown_pool()
+    return report
+
+
+def scenario_db_insert(args, modes):
+    """
+    Result write throughput against the SQLite stand-in.
+    """
+    import db
+    from benchmarks.db_insert import sample_records, row_by_row, bulk_insert, upsert_twice, RUN_ID
+
+    records = sample_records(args.rows)
+    report = {'rows': args.rows}
+    for label, write in (('row_by_row', row_by_row), ('bulk_insert', bulk_insert), ('upsert', upsert_twice)):
+        db.delete_run(RUN_ID)
+        start = time.perf_counter()
+        write(records)
+        seconds = time.perf_counter() - start
+        report[label] = {'seconds': round(seconds, 4), 'rows_per_sec': round(args.rows / seconds, 1)}
+    db.delete_run(RUN_ID)
+    return report
+
+
+def scenario_shortlist(args, modes):
+    """
+    First-stage ranking of a large applicant pool, with an empty and with a warm vector index.
+    """
+    import shortlist
+    from benchmarks.corpus import JOB_DESCRIPTION
+
+    texts = [text for _, text in corpus_texts(args.pool, seed=7 * 10**6, pages=args.pages)]
+    report = {'pool': args.pool, 'top_n': args.shortlist, 'backend': shortlist.backend_name()}
+    for label in ('cold_index', 'warm_index'):
+        start = time.perf_counter()
+        picked = shortlist.shortlist(texts, JOB_DESCRIPTION, args.shortlist)
+        seconds = time.perf_counter() - start
+        report[label] = {'seconds': round(seconds, 4), 'resumes_per_sec': round(args.pool / seconds, 1)}
+    report['crew_runs_avoided'] = args.pool - len(picked.selected)
+    return report
+
+
+def scenario_dedupe(args, modes):
+    """
+    Near-duplicate detection on a batch where every resume is uploaded twice with small edits, and crew runs avoided.
+    """
+    import dedupe
+    import result_cache
+    from screening import screen_resumes
+    from benchmarks.corpus import JOB_DESCRIPTION, resume_variant
+
+    originals = corpus_texts(args.count, seed=8 * 10**6, pages=args.pages)
+    variants = [(f"variant_{name}", resume_variant(text, index)) for index, (name, text) in enumerate(originals)]
+    report = {'resumes': len(originals) * 2}
+
+    start = time.perf_counter()
+    duplicate_of = dedupe.group_duplicates([text for _, text in originals + variants])
+    seconds = time.perf_counter() - start
+    expected = [None] * len(originals) + list(range(len(originals)))
+    report['grouping'] = {
+        'ms_per_resume': round(1000 * seconds / len(duplicate_of), 3),
+        'found': sum(found is not None and found == want for found, want in zip(duplicate_of, expected)),
+        'expected': len(originals),
+        'false_matches': sum(found is not None and found != want for found, want in zip(duplicate_of, expected)),
+    }
+    # Reusing the screening of an earlier upload goes through the result cache
+    cache_enabled, result_cache.CACHE_ENABLED = result_cache.CACHE_ENABLED, True
+    try:
+        for mode in modes:
+            # In one batch every variant shares the screening of its original
+            batch = screen_resumes(originals + variants, JOB_DESCRIPTION, mode=mode)
+            # Uploaded later, the variants find their originals in the index
+            history = screen_resumes(variants, JOB_DESCRIPTION, mode=mode)
+            report[mode] = {
+                'batch_crew_runs': sum(outcome.span['outcome'] == 'llm' for outcome in batch),
+                'batch_duplicates': sum(outcome.span['outcome'] == 'duplicate' for outcome in batch),
+                'near_duplicates_from_history': sum(outcome.span['outcome'] == 'near_duplicate' for outcome in history),
+            }
+    finally:
+        result_cache.CACHE_ENABLED = cache_enabled
+    return report
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'started_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def _numeric_leaves(report, prefix=''):
+    for key, value in report.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            yield from _numeric_leaves(value, path)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield path, value
+
+
+def compare(report, baseline, tolerance):
+    """
+    Return the metrics that got worse than `baseline` by more than `tolerance` (a fraction).
+
+    Rates (`*_per_sec`) should not drop; times and sizes (`*seconds`, `*_bytes`) should not grow.
+    """
+    previous = dict(_numeric_leaves(baseline.get('scenarios', {})))
+    regressions = []
+    for path, value in _numeric_leaves(report['scenarios']):
+        before = previous.get(path)
+        if not before:
+            continue
+        name = path.rsplit('.', 1)[-1]
+        if name.endswith('_per_sec'):
+            change = (before - value) / before
+        elif name.endswith('seconds') or name.endswith('_bytes'):
+            change = (value - before) / before
+        else:
+            continue
+        if change > tolerance:
+            regressions.append({'metric': path, 'baseline': before, 'current': value, 'worse_by': round(change, 4)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite for the screening pipeline (stub LLM, SQLite).')
+    parser.add_argument('--scenarios', type=str, default=','.join(SCENARIOS), help='Comma separated scenarios to run')
+    parser.add_argument('--modes', type=str, default='full,fast', help='Comma separated screening modes')
+    parser.add_argument('--latency', type=float, default=0.05, help='Simulated seconds per stub LLM call')
+    parser.add_argument('--samples', type=int, default=10, help='Resumes timed one by one in single_resume')
+    parser.add_argument('--count', type=int, default=24, help='Resumes per batch in the batch scenarios')
+    parser.add_argument('--pages', type=int, default=2, help='Experience sections per generated resume')
+    parser.add_argument('--concurrency', type=str, default='1,2,4,8', help='Comma separated worker counts for throughput')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows written in db_insert')
+    parser.add_argument('--pool', type=int, default=5000, help='Applicant pool ranked in shortlist')
+    parser.add_argument('--shortlist', type=int, default=50, help='Resumes kept by the shortlist scenario')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+    parser.add_argument('--baseline', type=str, help='Earlier JSON report to compare against; exits 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown before a metric counts as a regression')
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(',')]
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+
+    data_dir = offline.setup(latency=args.latency)
+    report = {
+        'environment': environment(),
+        'parameters': dict(vars(args), data_dir=data_dir),
+        'scenarios': {},
+    }
+    for name in scenarios:
+        print(f"Running {name}...", file=sys.stderr)
+        start = time.perf_counter()
+        report['scenarios'][name] = globals()[f"scenario_{name}"](args, modes)
+        print(f"  {name} took {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        report['regressions'] = compare(report, baseline, args.tolerance)
+        # Results are only comparable when the workload was the same
+        ignored = ('output', 'baseline', 'tolerance', 'data_dir', 'scenarios')
+        report['parameter_changes'] = {
+            name: [baseline.get('parameters', {}).get(name), value]
+            for name, value in report['parameters'].items()
+            if name not in ignored and baseline.get('parameters', {}).get(name) != value
+        }
+        exit_code = 1 if report['regressions'] else 0
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
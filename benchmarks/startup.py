@@ -0,0 +1,116 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from benchmarks.offline import OFFLINE_ENV
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter inside the tree being measured, so nothing is imported or cached yet
+PROBE = r"""
+import io, os, sys, json, time, resource
+sys.path.insert(0, os.getcwd())
+mode = sys.argv[1]
+
+start = time.perf_counter()
+import main_test
+import_seconds = time.perf_counter() - start
+
+client = main_test.app.test_client()
+start = time.perf_counter()
+client.get('/')
+first_get_seconds = time.perf_counter() - start
+
+# Trees with lazy pipelines build them on a background thread after the first request
+import new_test
+start = time.perf_counter()
+warm_up_thread = getattr(new_test, '_warm_up_thread', None)
+if warm_up_thread is not None:
+    warm_up_thread.join()
+warm_up_seconds = time.perf_counter() - start
+
+from benchmarks.stub_llm import StubLLM
+new_test.build_llm = lambda: StubLLM()
+start = time.perf_counter()
+response = client.post('/', data={
+    'mode': mode,
+    'job_desc': (io.BytesIO(b'Job Title: Software Engineer\nExperience: 3-6 years'), 'job_description.txt'),
+    'resumes': [(io.BytesIO(b'Name: Jane Doe\nSoftware Engineer, Acme (2019 - Present)\nSkills: Python'), 'resume.txt')],
+}, content_type='multipart/form-data', headers={'Accept': 'application/json'})
+job_id = response.get_json()['job_id']
+while client.get(f'/jobs/{job_id}').get_json()['status'] not in ('done', 'failed'):
+    time.sleep(0.02)
+first_screening_seconds = time.perf_counter() - start
+
+scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+print("STARTUP " + json.dumps({
+    'import_seconds': import_seconds,
+    'first_request_seconds': first_get_seconds,
+    'warm_up_seconds': warm_up_seconds,
+    'first_screening_seconds': first_screening_seconds,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+}))
+sys.stdout.flush()
+os._exit(0)
+"""
+
+
+def export_tree(ref):
+    """
+    Write the files of a git revision to a temporary folder and return its path.
+    """
+    folder = tempfile.mkdtemp(prefix='hr_startup_')
+    archive = subprocess.run(['git', 'archive', ref], cwd=REPO_ROOT, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', folder], input=archive, check=True)
+    return folder
+
+
+def probe(tree, mode):
+    data_dir = tempfile.mkdtemp(prefix='hr_startup_data_')
+    env = dict(os.environ, **OFFLINE_ENV)
+    env.update({
+        'HR_DATA_DIR': data_dir,
+        'DATABASE_URL': 'sqlite:///' + os.path.join(data_dir, 'results.sqlite3'),
+        'OPENAI_API_KEY': os.getenv('OPENAI_API_KEY', 'sk-offline-benchmark'),
+    })
+    completed = subprocess.run([sys.executable, '-c', PROBE, mode], cwd=tree, env=env, capture_output=True, text=True)
+    for line in completed.stdout.splitlines():
+        if line.startswith('STARTUP '):
+            return json.loads(line[len('STARTUP '):])
+    raise RuntimeError(f"Startup probe failed in {tree}:\n{completed.stderr[-2000:]}")
+
+
+def measure(tree, mode, repeat):
+    samples = [probe(tree, mode) for _ in range(repeat)]
+    return {
+        name: round(statistics.median(sample[name] for sample in samples), 3)
+        for name in samples[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold import, first request and first screening latency of the web app.')
+    parser.add_argument('--ref', action='append', default=[], help='Also measure this git revision (repeatable), e.g. HEAD~1')
+    parser.add_argument('--mode', type=str, default='fast', help='Screening mode of the first screening')
+    parser.add_argument('--repeat', type=int, default=3, help='Fresh processes per tree; medians are reported')
+    parser.add_argument('--output', type=str, help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = {'mode': args.mode, 'repeat': args.repeat, 'trees': {}}
+    for ref in args.ref:
+        report['trees'][ref] = measure(export_tree(ref), args.mode, args.repeat)
+    report['trees']['working tree'] = measure(REPO_ROOT, args.mode, args.repeat)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+import re
+import json
+import time
+import hashlib
+import threading
+from types import SimpleNamespace
+
+from crewai.llms.base_llm import BaseLLM
+
+_NAME_RE = re.compile(r'(?:CANDIDATE NAME|"candidate_name"|Name)\s*[:=]\s*"?([A-Z][\w.\'-]*(?: [A-Z][\w.\'-]*){0,3})')
+_SCORE_RE = re.compile(r'OVERALL SCORE\s*[:\-]?\s*(\d{1,3})')
+_ROLE_RE = re.compile(r'You are ([^.\n]+)\.')
+
+
+def estimate_tokens(text):
+    """
+    Rough token count (about four characters per token) used for offline accounting.
+    """
+    return max(1, len(text) // 4)
+
+
+def canned_score(name):
+    """
+    Deterministic score for a candidate so every mode scores the same resume the same way.
+    """
+    return 20 + int(hashlib.sha256(name.encode('utf-8')).hexdigest(), 16) % 80
+
+
+def canned_tag(score):
+    return 'QUALIFIED' if score >= 75 else 'NOT QUALIFIED'
+
+
+def canned_feedback(score):
+    if score >= 75:
+        return "1. Walk us through your most relevant project.\n2. How do you approach debugging production issues?"
+    return "Not suitable resume"
+
+
+class StubLLM(BaseLLM):
+    """
+    Deterministic stand-in for ChatOpenAI that replays canned answers for every agent of the crew.
+
+    Each call sleeps for `latency` seconds and counts approximate prompt and
+    completion tokens, so pipelines can be benchmarked without calling OpenAI.
+    """
+
+    def __init__(self, model='stub-gpt-4o', latency=0.0, temperature=None):
+        super().__init__(model=model, temperature=temperature)
+        self.latency = latency
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+        prompt = messages if isinstance(messages, str) else "\n".join(str(m.get('content', '')) for m in messages)
+        if self.latency:
+            time.sleep(self.latency)
+        answer = self._answer(prompt)
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += estimate_tokens(prompt)
+            self.completion_tokens += estimate_tokens(answer)
+        # Report usage like a real completion so the agents' token counters (and the metrics spans) see it
+        usage = SimpleNamespace(prompt_tokens=estimate_tokens(prompt), completion_tokens=estimate_tokens(answer))
+        for callback in callbacks or []:
+            if hasattr(callback, 'log_success_event'):
+                callback.log_success_event(kwargs={}, response_obj={'usage': usage}, start_time=0, end_time=0)
+        return answer
+
+    def usage(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'prompt_tokens': self.prompt_tokens,
+                'completion_tokens': self.completion_tokens,
+            }
+
+    def _answer(self, prompt):
+        role_match = _ROLE_RE.search(prompt)
+        role = role_match.group(1) if role_match else ''
+        name_match = _NAME_RE.search(prompt)
+        name = name_match.group(1) if name_match else 'Unknown Candidate'
+        score_match = _SCORE_RE.search(prompt)
+        score = int(score_match.group(1)) if score_match else canned_score(name)
+        tag = canned_tag(score)
+        record = {
+            'candidate_name': name,
+            'overall_score': score,
+            'tag': tag,
+            'explanation': f"Stub evaluation for {name}.",
+            'feedback': canned_feedback(score),
+        }
+
+        if role == 'Resume Summarizer':
+            body = f"Name: {name}\nExperience: 4 years\nPrevious job titles: Software Engineer\nSkills: Python, SQL"
+        elif role == 'Resume Evaluator':
+            body = f"CANDIDATE NAME: {name}\nOVERALL SCORE: {score}\nTAG: {tag}\n{record['explanation']}"
+        elif role == 'Interview Question Generator':
+            body = record['feedback']
+        elif role == 'Structured Output Editor':
+            body = (f"Evaluation Result:\n- CANDIDATE NAME: {name}\n- OVERALL SCORE: {score}\n- TAG: {tag}\n"
+                    f"- EXPLANATION OF SCORE AWARDED: {record['explanation']}\nFeedback:\n- {record['feedback']}")
+        elif role == 'Output Parser':
+            body = "```json\n" + json.dumps([record], indent=2) + "\n```"
+        else:
+            body = json.dumps(record)
+        return f"Thought: I now can give a great answer\nFinal Answer: {body}"
+
+    def supports_function_calling(self):
+        return False
+
+    def supports_stop_words(self):
+        return True
+
+    def get_context_window_size(self):
+        return 128000
@@ -0,0 +1,368 @@
+import os
+import time
+import logging
+import threading
+from urllib.parse import quote_plus
+
+from sqlalchemy import (
+    create_engine, make_url, inspect, text, MetaData, Table, Column, Integer, String, Text, Float, Index, select, update
+)
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+# Connection pool configuration
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+# Rows sent per executemany round trip
+INSERT_BATCH_SIZE = int(os.getenv('DB_INSERT_BATCH_SIZE', '1000'))
+
+# Databases with an upsert statement, see _upsert_statement
+SUPPORTED_DIALECTS = ('mysql', 'postgresql', 'sqlite')
+
+RESULT_FIELDS = ('candidate_name', 'overall_score', 'tag', 'explanation', 'feedback')
+# The long text fields are only loaded when a single result is opened
+LISTING_FIELDS = ('id', 'candidate_name', 'overall_score', 'tag', 'duplicate_of')
+DETAIL_FIELDS = ('explanation', 'feedback')
+
+metadata = MetaData()
+
+# One row per screening batch; a run shares its id with the queued job that produces it
+screening_run = Table(
+    'screening_run', metadata,
+    Column('id', String(32), primary_key=True),
+    Column('mode', String(16)),
+    Column('status', String(16), nullable=False),
+    Column('created_at', Float, nullable=False),
+    Column('finished_at', Float),
+)
+
+hr_resume_results = Table(
+    'hr_resume_results', metadata,
+    Column('id', Integer, primary_key=True, autoincrement=True),
+    Column('run_id', String(32)),
+    # Identifies one screened resume (run id and upload position) so repeated writes update in place
+    Column('resume_key', String(64)),
+    Column('candidate_name', String(255)),
+    Column('overall_score', Integer),
+    Column('tag', String(32)),
+    Column('explanation', Text),
+    Column('feedback', Text),
+    # resume_key of the near-duplicate resume of the same run whose screening this result reuses
+    Column('duplicate_of', String(64)),
+    Index('uq_hr_resume_results_resume_key', 'resume_key', unique=True),
+)
+# Serve the per-run results pages, best score first, however much history accumulates.
+# Both end in the primary key, which breaks ties in score order.
+run_score_index = Index(
+    'ix_hr_resume_results_run_score', hr_resume_results.c.run_id, hr_resume_results.c.overall_score.desc()
+)
+run_tag_score_index = Index(
+    'ix_hr_resume_results_run_tag_score',
+    hr_resume_results.c.run_id, hr_resume_results.c.tag, hr_resume_results.c.overall_score.desc()
+)
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def database_url():
+    """
+    Return DATABASE_URL, or build the MySQL URL from the MYSQL_* settings.
+    """
+    url = os.getenv('DATABASE_URL')
+    if url:
+        return url
+    return "mysql+mysqlconnector://{user}:{password}@{host}/{db}".format(
+        user=quote_plus(os.getenv('MYSQL_USER') or ''),
+        password=quote_plus(os.getenv('MYSQL_PASSWORD') or ''),
+        host=os.getenv('MYSQL_HOST') or 'localhost',
+        db=os.getenv('MYSQL_DB') or ''
+    )
+
+
+def get_engine():
+    """
+    Return the process-wide pooled engine, creating it and the schema on first use.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            url = database_url()
+            options = {'pool_pre_ping': True}
+            if not url.startswith('sqlite'):
+                options.update(pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW, pool_recycle=POOL_RECYCLE)
+            backend = make_url(url).get_backend_name()
+            if backend not in SUPPORTED_DIALECTS:
+                # Fail at startup rather than at the first upsert, after a whole batch has been screened
+                raise RuntimeError(
+                    f"DATABASE_URL uses {backend}; supported databases are {', '.join(SUPPORTED_DIALECTS)}."
+                )
+            engine = create_engine(url, **options)
+            ensure_schema(engine)
+            _engine = engine
+        return _engine
+
+
+def dispose_engine():
+    """
+    Close every pooled connection, e.g. in a freshly forked worker process.
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+
+
+def ping():
+    """
+    Run a trivial query, raising if the database cannot be reached.
+    """
+    with get_engine().connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+def ensure_schema(engine):
+    """
+    Create the results table, or add the columns and indexes newer code relies on to an existing one.
+    """
+    metadata.create_all(engine)
+    inspector = inspect(engine)
+    columns = {column['name'] for column in inspector.get_columns('hr_resume_results')}
+    indexes = {index['name'] for index in inspector.get_indexes('hr_resume_results')}
+    with engine.begin() as conn:
+        if 'run_id' not in columns:
+            conn.execute(text("ALTER TABLE hr_resume_results ADD COLUMN run_id VARCHAR(32)"))
+        if 'resume_key' not in columns:
+            conn.execute(text("ALTER TABLE hr_resume_results ADD COLUMN resume_key VARCHAR(64)"))
+        if 'uq_hr_resume_results_resume_key' not in indexes:
+            conn.execute(text("CREATE UNIQUE INDEX uq_hr_resume_results_resume_key ON hr_resume_results (resume_key)"))
+        if 'duplicate_of' not in columns:
+            conn.execute(text("ALTER TABLE hr_resume_results ADD COLUMN duplicate_of VARCHAR(64)"))
+        for index in (run_score_index, run_tag_score_index):
+            if index.name not in indexes:
+                index.create(conn)
+
+
+def flatten_results(results):
+    """
+    Accept parser output in any of its shapes (record, list of records, list of lists) and return flat records.
+    """
+    records = []
+    for item in results:
+        if isinstance(item, dict):
+            records.append(item)
+        elif isinstance(item, (list, tuple)):
+            records.extend(flatten_results(item))
+    return records
+
+
+def _score(value):
+    # Scores are ranked and paged on, so anything unparseable is stored as 0 rather than NULL
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _row(record, run_id=None, resume_key=None, duplicate_of=None):
+    row = {field: record.get(field) for field in RESULT_FIELDS}
+    row['overall_score'] = _score(row['overall_score'])
+    row['run_id'] = run_id
+    row['resume_key'] = resume_key
+    row['duplicate_of'] = duplicate_of
+    return row
+
+
+def _log_throughput(action, rows, started):
+    elapsed = time.perf_counter() - started
+    rate = rows / elapsed if elapsed > 0 else float('inf')
+    logging.info(f"{action} {rows} rows into hr_resume_results in {elapsed * 1000:.1f} ms ({rate:.0f} rows/s)")
+
+
+def _batches(rows):
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        yield rows[start:start + INSERT_BATCH_SIZE]
+
+
+def start_run(run_id, mode=None):
+    """
+    Record a screening run as running; calling it again for a resumed run is harmless.
+    """
+    with get_engine().begin() as conn:
+        updated = conn.execute(
+            update(screening_run).where(screening_run.c.id == run_id).values(status='running', finished_at=None)
+        ).rowcount
+        if not updated:
+            conn.execute(screening_run.insert().values(id=run_id, mode=mode, status='running', created_at=time.time()))
+
+
+def finish_run(run_id, error=None):
+    """
+    Mark a screening run as done, or failed.
+    """
+    with get_engine().begin() as conn:
+        conn.execute(
+            update(screening_run).where(screening_run.c.id == run_id).values(
+                status='done' if error is None else 'failed', finished_at=time.time()
+            )
+        )
+
+
+def get_run(run_id):
+    """
+    Return a screening run as a dict, or None if unknown.
+    """
+    with get_engine().connect() as conn:
+        row = conn.execute(select(screening_run).where(screening_run.c.id == run_id)).mappings().first()
+    return dict(row) if row else None
+
+
+def insert_results(records, run_id=None):
+    """
+    Bulk insert result records for a run with one executemany per batch.
+    """
+    rows = [_row(record, run_id) for record in flatten_results(records)]
+    if not rows:
+        return 0
+    started = time.perf_counter()
+    with get_engine().begin() as conn:
+        for batch in _batches(rows):
+            conn.execute(hr_resume_results.insert(), batch)
+    _log_throughput("Inserted", len(rows), started)
+    return len(rows)
+
+
+def _upsert_statement(engine):
+    # duplicate_of is kept from the first write, so republishing a job without it loses nothing
+    update_fields = RESULT_FIELDS
+    if engine.dialect.name == 'mysql':
+        stmt = mysql_insert(hr_resume_results)
+        return stmt.on_duplicate_key_update({field: stmt.inserted[field] for field in update_fields})
+    if engine.dialect.name in ('sqlite', 'postgresql'):
+        stmt = (sqlite_insert if engine.dialect.name == 'sqlite' else postgresql_insert)(hr_resume_results)
+        return stmt.on_conflict_do_update(
+            index_elements=['resume_key'],
+            set_={field: stmt.excluded[field] for field in update_fields}
+        )
+    raise NotImplementedError(f"Upserts are not supported for {engine.dialect.name}")
+
+
+def upsert_results(run_id, keyed_records, duplicates=None):
+    """
+    Insert or update result records of a run keyed by resume, e.g. as each resume of a batch finishes.
+
+    `keyed_records` is a list of (resume_key, record) pairs; a record may also be a
+    list of records from the parser, in which case the first one is stored.
+    `duplicates` maps the resume_key of a near-duplicate to the resume_key it duplicates.
+    """
+    duplicates = duplicates or {}
+    rows = []
+    for resume_key, record in keyed_records:
+        records = flatten_results([record])
+        if records:
+            rows.append(_row(records[0], run_id, resume_key, duplicates.get(resume_key)))
+    if not rows:
+        return 0
+    engine = get_engine()
+    started = time.perf_counter()
+    stmt = _upsert_statement(engine)
+    with engine.begin() as conn:
+        for batch in _batches(rows):
+            conn.execute(stmt, batch)
+    _log_throughput("Upserted", len(rows), started)
+    return len(rows)
+
+
+def delete_run(run_id):
+    """
+    Remove a screening run and its results.
+    """
+    with get_engine().begin() as conn:
+        conn.execute(hr_resume_results.delete().where(hr_resume_results.c.run_id == run_id))
+        conn.execute(screening_run.delete().where(screening_run.c.id == run_id))
+
+
+def fetch_results(run_id):
+    """
+    Return the results of one screening run, best score first.
+    """
+    query = select(*(hr_resume_results.c[field] for field in RESULT_FIELDS)).where(
+        hr_resume_results.c.run_id == run_id
+    ).order_by(hr_resume_results.c.overall_score.desc())
+    with get_engine().connect() as conn:
+        return [dict(row) for row in conn.execute(query).mappings()]
+
+
+def encode_cursor(row):
+    """
+    Return the cursor that continues a results page after `row`.
+    """
+    return f"{row['overall_score']}:{row['id']}"
+
+
+def decode_cursor(cursor):
+    """
+    Split a cursor from `encode_cursor` into (score, id); raises ValueError if malformed.
+    """
+    score, _, result_id = (cursor or '').partition(':')
+    return int(score), int(result_id)
+
+
+def fetch_results_page(run_id, limit=50, after=None, tag=None, min_score=None, max_score=None, group_duplicates=False):
+    """
+    Return one page of a run's results without the long text fields, and the cursor of the next page.
+
+    Pages are ordered by score (best first), then by id, and continue after the
+    `after` cursor so deep pages cost the same as the first one. With
+    `group_duplicates`, near-duplicates are left out of the page and listed
+    under the result they duplicate, as `duplicates`.
+    """
+    c = hr_resume_results.c
+    columns = [c[field] for field in LISTING_FIELDS]
+    query = select(*columns, c.resume_key).where(c.run_id == run_id)
+    if group_duplicates:
+        query = query.where(c.duplicate_of.is_(None))
+    if tag:
+        query = query.where(c.tag == tag)
+    if min_score is not None:
+        query = query.where(c.overall_score >= min_score)
+    if max_score is not None:
+        query = query.where(c.overall_score <= max_score)
+    if after:
+        score, result_id = decode_cursor(after)
+        query = query.where((c.overall_score < score) | ((c.overall_score == score) & (c.id > result_id)))
+    # One extra row tells whether another page follows
+    query = query.order_by(c.overall_score.desc(), c.id).limit(limit + 1)
+
+    with get_engine().connect() as conn:
+        rows = [dict(row) for row in conn.execute(query).mappings()]
+        keys = [row['resume_key'] for row in rows[:limit] if row['resume_key']]
+        duplicates = {}
+        if group_duplicates and keys:
+            # Every duplicate of the page in one query
+            for row in conn.execute(
+                select(*columns).where((c.run_id == run_id) & c.duplicate_of.in_(keys)).order_by(c.id)
+            ).mappings():
+                duplicates.setdefault(row['duplicate_of'], []).append(dict(row))
+    for row in rows:
+        resume_key = row.pop('resume_key')
+        if group_duplicates:
+            row['duplicates'] = duplicates.get(resume_key, [])
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def fetch_result_details(run_id, result_id):
+    """
+    Return the explanation and feedback of one result of a run, or None if unknown.
+    """
+    c = hr_resume_results.c
+    query = select(*(c[field] for field in LISTING_FIELDS + DETAIL_FIELDS)).where(
+        (c.run_id == run_id) & (c.id == result_id)
+    )
+    with get_engine().connect() as conn:
+        row = conn.execute(query).mappings().first()
+    return dict(row) if row else None
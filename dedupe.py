@@ -0,0 +1,192 @@
+import os
+import re
+import time
+import zlib
+import hashlib
+import logging
+import threading
+from contextlib import closing
+
+import numpy as np
+
+from storage import connect
+from result_cache import text_hash
+
+DEDUPE_ENABLED = os.getenv('DEDUPE_ENABLED', 'true').lower() == 'true'
+# Estimated Jaccard similarity of word shingles above which two resumes count as the same CV
+DEDUPE_THRESHOLD = float(os.getenv('DEDUPE_THRESHOLD', '0.8'))
+NUM_PERM = int(os.getenv('DEDUPE_NUM_PERM', '128'))
+# LSH bands; with 32 bands of 4 rows, pairs above about 0.45 similarity become candidates
+BANDS = int(os.getenv('DEDUPE_BANDS', '32'))
+SHINGLE_SIZE = int(os.getenv('DEDUPE_SHINGLE_SIZE', '5'))
+# Signatures kept in the index, most recently screened first
+INDEX_MAX_ROWS = int(os.getenv('DEDUPE_INDEX_MAX_ROWS', '100000'))
+
+ROWS = NUM_PERM // BANDS
+# Signatures from other settings are not comparable, so each set of settings has its own index
+INDEX_DB = f"minhash-{NUM_PERM}-{BANDS}-{SHINGLE_SIZE}.sqlite3"
+
+_PRIME = (1 << 31) - 1
+# Fixed seed: stored signatures are only comparable with the same permutations
+_rng = np.random.default_rng(1)
+_PERM_A = _rng.integers(1, _PRIME, NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+# Shingles hashed per step, bounding the temporary (shingles x permutations) matrix
+_CHUNK = 2048
+
+_WORD_RE = re.compile(r'\w+')
+
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def shingles(text):
+    """
+    Return the hashes of the overlapping SHINGLE_SIZE-word runs of a text, ignoring case, punctuation and layout.
+    """
+    words = _WORD_RE.findall((text or '').lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    size = min(SHINGLE_SIZE, len(words))
+    runs = {' '.join(words[start:start + size]) for start in range(len(words) - size + 1)}
+    # crc32 is stable across processes, unlike hash(), so stored signatures stay valid
+    return np.fromiter((zlib.crc32(run.encode('utf-8')) % _PRIME for run in runs), dtype=np.uint64, count=len(runs))
+
+
+def signature(text):
+    """
+    Return the MinHash signature (NUM_PERM uint32 values) of a text, or None if it has no words.
+    """
+    hashes = shingles(text)
+    if not len(hashes):
+        return None
+    minimum = np.full(NUM_PERM, _PRIME, dtype=np.uint64)
+    for start in range(0, len(hashes), _CHUNK):
+        # a * h + b stays below 2**62, so uint64 never overflows
+        permuted = (np.outer(hashes[start:start + _CHUNK], _PERM_A) + _PERM_B) % _PRIME
+        np.minimum(minimum, permuted.min(axis=0), out=minimum)
+    return minimum.astype(np.uint32)
+
+
+def similarity(first, second):
+    """
+    Estimate the Jaccard similarity of two texts from their signatures.
+    """
+    return float(np.count_nonzero(first == second)) / NUM_PERM
+
+
+def band_keys(sig):
+    """
+    Return the LSH bucket of each band of a signature as signed 64-bit ints (SQLite integers).
+    """
+    keys = []
+    for band in range(BANDS):
+        rows = sig[band * ROWS:(band + 1) * ROWS].tobytes()
+        digest = hashlib.blake2b(band.to_bytes(2, 'little') + rows, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def group_duplicates(texts):
+    """
+    Find near-duplicates within a batch; return, for each text, the index of the earlier text it duplicates, or None.
+
+    Texts are only matched against texts that are not duplicates themselves,
+    so a chain of small edits never drifts away from the first version.
+    """
+    duplicate_of = [None] * len(texts)
+    if not DEDUPE_ENABLED:
+        return duplicate_of
+    signatures = [signature(text) for text in texts]
+    buckets = {}
+    for index, sig in enumerate(signatures):
+        if sig is None:
+            continue
+        keys = band_keys(sig)
+        candidates = {first for key in keys for first in buckets.get(key, ())}
+        matches = [(similarity(sig, signatures[first]), first) for first in candidates]
+        matches = [(score, first) for score, first in matches if score >= DEDUPE_THRESHOLD]
+        if matches:
+            # The most similar one, the earliest on ties
+            duplicate_of[index] = max(matches, key=lambda match: (match[0], -match[1]))[1]
+            continue
+        for key in keys:
+            buckets.setdefault(key, []).append(index)
+    return duplicate_of
+
+
+def _init_index(conn):
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS minhash_signatures (
+                resume_hash TEXT PRIMARY KEY,
+                signature BLOB NOT NULL,
+                seen_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_minhash_signatures_seen ON minhash_signatures (seen_at);
+            CREATE TABLE IF NOT EXISTS minhash_bands (
+                band_key INTEGER NOT NULL,
+                resume_hash TEXT NOT NULL,
+                PRIMARY KEY (band_key, resume_hash)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_minhash_bands_resume ON minhash_bands (resume_hash);
+        """)
+        _initialized = True
+
+
+def similar_resumes(sig, limit=5):
+    """
+    Return (resume hash, similarity) pairs of previously screened resumes at least DEDUPE_THRESHOLD similar, best first.
+    """
+    if not DEDUPE_ENABLED or sig is None:
+        return []
+    keys = band_keys(sig)
+    with closing(connect(INDEX_DB)) as conn:
+        _init_index(conn)
+        rows = conn.execute(
+            "SELECT resume_hash, signature FROM minhash_signatures WHERE resume_hash IN ("
+            f"SELECT resume_hash FROM minhash_bands WHERE band_key IN ({', '.join('?' * len(keys))}))",
+            keys
+        ).fetchall()
+    matches = [(row['resume_hash'], similarity(sig, np.frombuffer(row['signature'], dtype=np.uint32))) for row in rows]
+    matches = [match for match in matches if match[1] >= DEDUPE_THRESHOLD]
+    return sorted(matches, key=lambda match: -match[1])[:limit]
+
+
+def remember(resume_text, sig=None):
+    """
+    Add a screened resume to the index so later near-duplicates can reuse its cached result.
+    """
+    if not DEDUPE_ENABLED:
+        return
+    sig = signature(resume_text) if sig is None else sig
+    if sig is None:
+        return
+    resume_hash = text_hash(resume_text)
+    with closing(connect(INDEX_DB)) as conn:
+        _init_index(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO minhash_signatures (resume_hash, signature, seen_at) VALUES (?, ?, ?)",
+                (resume_hash, sig.tobytes(), time.time())
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO minhash_bands (band_key, resume_hash) VALUES (?, ?)",
+                [(key, resume_hash) for key in band_keys(sig)]
+            )
+            stale = [row['resume_hash'] for row in conn.execute(
+                "SELECT resume_hash FROM minhash_signatures ORDER BY seen_at DESC LIMIT -1 OFFSET ?", (INDEX_MAX_ROWS,)
+            )]
+            if stale:
+                conn.executemany("DELETE FROM minhash_signatures WHERE resume_hash = ?", [(key,) for key in stale])
+                conn.executemany("DELETE FROM minhash_bands WHERE resume_hash = ?", [(key,) for key in stale])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    if stale:
+        logging.info(f"Dropped {len(stale)} resumes from the near-duplicate index.")
@@ -0,0 +1,185 @@
+import io
+import os
+import atexit
+import logging
+import threading
+import multiprocessing
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz
+from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+# Upper bounds on what is read from a single document
+MAX_PAGES = int(os.getenv('EXTRACT_MAX_PAGES', '50'))
+MAX_CHARS = int(os.getenv('EXTRACT_MAX_CHARS', '200000'))
+EXTRACT_WORKERS = int(os.getenv('EXTRACT_WORKERS', str(os.cpu_count() or 2)))
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def iter_pdf_pages(source, max_pages=None):
+    """
+    Yield the text of each PDF page, one page at a time.
+
+    `source` is a file path or the raw bytes of the document.
+    """
+    doc = fitz.open(stream=source, filetype='pdf') if isinstance(source, bytes) else fitz.open(source)
+    with doc:
+        for page in islice(doc, max_pages or MAX_PAGES):
+            yield page.get_text()
+
+
+def _iter_docx_blocks(doc):
+    # Body paragraphs and tables in document order
+    for child in doc.element.body.iterchildren():
+        if child.tag.endswith('}p'):
+            yield Paragraph(child, doc)
+        elif child.tag.endswith('}tbl'):
+            yield Table(child, doc)
+
+
+def _table_text(table):
+    cells = []
+    for row in table.rows:
+        previous = None
+        for cell in row.cells:
+            # Merged cells are returned once per grid column
+            if cell._tc is not previous:
+                cells.append(cell.text)
+            previous = cell._tc
+    return ' '.join(cells)
+
+
+def iter_docx_chunks(source):
+    """
+    Yield the text of a DOCX file: headers, body paragraphs and tables, then footers.
+
+    `source` is a file path or the raw bytes of the document.
+    """
+    doc = Document(io.BytesIO(source) if isinstance(source, bytes) else source)
+    for section in doc.sections:
+        for para in section.header.paragraphs:
+            yield para.text
+    for block in _iter_docx_blocks(doc):
+        yield block.text if isinstance(block, Paragraph) else _table_text(block)
+    for section in doc.sections:
+        for para in section.footer.paragraphs:
+            yield para.text
+
+
+def _join_limited(chunks, max_chars):
+    # Collect chunks into a list and join once, stopping at the character budget
+    parts = []
+    size = 0
+    for chunk in chunks:
+        if size + len(chunk) >= max_chars:
+            parts.append(chunk[:max_chars - size])
+            break
+        parts.append(chunk)
+        size += len(chunk) + 1
+    return parts
+
+
+def extract_text(fname, max_pages=None, max_chars=None):
+    """
+    Extract the text of a PDF, TXT or DOCX file, reading at most `max_pages` pages and `max_chars` characters.
+    """
+    return _extract(fname, fname, max_pages, max_chars)
+
+
+def extract_bytes(data, filename, max_pages=None, max_chars=None):
+    """
+    Extract the text of an in-memory document; `filename` only decides the format.
+    """
+    return _extract(data, filename, max_pages, max_chars)
+
+
+def _extract(source, fname, max_pages, max_chars):
+    max_chars = max_chars or MAX_CHARS
+    file_extension = fname.split('.')[-1].lower()
+
+    if file_extension == 'pdf':
+        # Line breaks are kept: normalization uses them to find sections and cut at line boundaries
+        return ''.join(_join_limited(iter_pdf_pages(source, max_pages), max_chars))
+
+    elif file_extension == 'txt':
+        if isinstance(source, bytes):
+            return source.decode('utf-8')[:max_chars]
+        with open(source, 'r', encoding='utf-8') as file:
+            return file.read(max_chars)
+
+    elif file_extension == 'docx':
+        # One paragraph (or table row set) per line
+        return '\n'.join(_join_limited(iter_docx_chunks(source), max_chars))
+
+    else:
+        raise ValueError("Unsupported file format. Please use PDF, TXT, or DOCX.")
+
+
+def _extract_source(source):
+    # Pool entry point: a path, or a (filename, bytes) pair from an upload
+    if isinstance(source, tuple):
+        return extract_bytes(source[1], source[0])
+    return extract_text(source)
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned workers only import this module, not the Flask app and its threads
+            _pool = ProcessPoolExecutor(
+                max_workers=EXTRACT_WORKERS,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """
+    Stop the extraction worker processes.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_pool)
+
+
+def extract_many(sources):
+    """
+    Extract several documents in parallel worker processes.
+
+    Each source is a file path or a (filename, bytes) pair. Returns one entry
+    per source in input order: the extracted text, or the exception raised
+    while reading it.
+    """
+    futures = None
+    if len(sources) > 1 and EXTRACT_WORKERS > 1:
+        pool = _get_pool()
+        futures = [pool.submit(_extract_source, source) for source in sources]
+
+    results = []
+    for index, source in enumerate(sources):
+        name = source[0] if isinstance(source, tuple) else source
+        try:
+            results.append(futures[index].result() if futures else _extract_source(source))
+        except BrokenProcessPool as e:
+            # A crashed worker breaks the whole pool; start a fresh one next time
+            logging.error(f"Extraction worker crashed while reading {name}: {e}")
+            shutdown_pool()
+            results.append(e)
+        except Exception as e:
+            logging.error(f"Error extracting text from {name}: {e}")
+            results.append(e)
+    return results
@@ -0,0 +1,43 @@
+import os
+import multiprocessing
+
+# Production server settings: gunicorn -c gunicorn.conf.py main_test:app
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+# Each worker process also runs JOB_WORKERS screening threads, so keep this modest
+workers = int(os.getenv('GUNICORN_WORKERS', str(min(multiprocessing.cpu_count(), 4))))
+# Threaded workers keep progress streams (/jobs/<id>/stream) from tying up a whole process
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Uploads are extracted inside the request, so large batches need more than the 30s default
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+# Off by default: a recycled worker takes its running screening threads down with it, and
+# their jobs only resume (from the unfinished resumes) once another worker requeues them
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '0'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# Import the app once in the master so workers share its memory and start faster
+preload_app = os.getenv('GUNICORN_PRELOAD', 'true').lower() == 'true'
+
+loglevel = os.getenv('LOG_LEVEL', 'info').lower()
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def when_ready(server):
+    if preload_app:
+        # The LLM stack is imported lazily; importing it here once lets every worker
+        # share it instead of paying for the import after the fork
+        import crewai
+        import langchain_openai
+        server.log.info("Preloaded the LLM libraries.")
+
+
+def post_fork(server, worker):
+    # Pooled database connections must not be shared with the master or sibling workers
+    import db
+    db.dispose_engine()
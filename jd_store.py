@@ -0,0 +1,268 @@
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from contextlib import closing
+
+from storage import connect
+
+JD_DB = 'jd_store.sqlite3'
+# Bump when the parser changes so stored profiles are rebuilt
+PROFILE_VERSION = '2'
+
+# Full text is only added to the compact profile when the key requirements could not be found
+PROFILE_EXCERPT_CHARS = 1500
+# A shorter excerpt backs up a title that was only guessed (not from a "Job title:" line)
+PROFILE_TITLE_EXCERPT_CHARS = 600
+
+_profiles = {}
+_profiles_lock = threading.Lock()
+_initialized = False
+
+_YEARS = r'(\d{1,2}(?:\.\d)?)'
+_YEARS_UNIT = r'\s*(?:years?|yrs?)'
+_RANGE_RE = re.compile(_YEARS + r'\s*(?:-|–|to)\s*' + _YEARS + r'\s*\+?' + _YEARS_UNIT, re.I)
+_OPEN_RE = re.compile(_YEARS + r'\s*\+' + _YEARS_UNIT, re.I)
+_MIN_RE = re.compile(r'(?:minimum|at least|min\.?)\s*(?:of\s*)?' + _YEARS + r'\+?' + _YEARS_UNIT, re.I)
+_PLAIN_RE = re.compile(_YEARS + _YEARS_UNIT + r'\s*(?:of\s*)?(?:\w+\s+){0,3}?experience', re.I)
+
+# The title ends at a location or remote suffix: "(Remote)", ", Bangalore", " - Remote"
+_TITLE_RE = re.compile(
+    r'(?:job\s*title|position|role|designation)\s*[:\-–]\s*'
+    r'([A-Za-z][A-Za-z0-9/&.+#\- ]{2,60}?)'
+    r'(?=\s*(?:\n|\||$|•|\(|,|\s{2,}|\s[-–]\s|(?:location|experience|department|job\s*type|employment|about|salary|company)\b))',
+    re.I
+)
+_HIRING_RE = re.compile(
+    r'(?:looking for|hiring|seeking)\s+(?:an?\s+)?(?:experienced\s+|talented\s+|skilled\s+)?'
+    r'([A-Z][A-Za-z0-9/&+#\- ]{2,50}?)(?=\s+(?:to|who|with|for|in|at)\b|[.,\n])'
+)
+_EDUCATION_RE = re.compile(
+    r"\b((?:bachelor'?s?|master'?s?|b\.?\s?tech|m\.?\s?tech|b\.?\s?e\b|m\.?\s?e\b|b\.?\s?sc|m\.?\s?sc|"
+    r"bca|mca|mba|ph\.?\s?d|graduate|degree)[^.;•\n]{0,80})",
+    re.I
+)
+_SKILLS_HEADING_RE = re.compile(
+    r'(?:skills|requirements|qualifications|must have|technical expertise)\s*(?:required)?\s*[:\-–]?',
+    re.I
+)
+_SKILL_SPLIT_RE = re.compile(r'[,;•\n|]|\s-\s|\band\b')
+_SKILL_FILLER_RE = re.compile(
+    r'^(?:strong|good|solid|excellent|hands-on|deep|experience (?:with|in)|knowledge of|'
+    r'proficiency (?:with|in)|familiarity with|expertise in)\s+|\s+(?:skills?|experience)$',
+    re.I
+)
+
+# Common skills recognised anywhere in a job description, in addition to listed ones
+SKILL_KEYWORDS = [
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'go', 'rust', 'scala', 'kotlin', 'swift',
+    'php', 'ruby', 'sql', 'nosql', 'mysql', 'postgresql', 'mongodb', 'redis', 'oracle', 'html', 'css',
+    'react', 'angular', 'vue', 'node.js', 'django', 'flask', 'fastapi', 'spring', '.net', 'rest',
+    'graphql', 'microservices', 'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'jenkins',
+    'ci/cd', 'git', 'linux', 'spark', 'hadoop', 'kafka', 'airflow', 'snowflake', 'tableau', 'power bi',
+    'excel', 'machine learning', 'deep learning', 'nlp', 'computer vision', 'tensorflow', 'pytorch',
+    'scikit-learn', 'pandas', 'numpy', 'llm', 'data analysis', 'statistics', 'selenium', 'jira',
+    'agile', 'scrum', 'devops', 'sap', 'salesforce', 'figma', 'communication', 'leadership',
+]
+_SKILL_KEYWORD_RES = [
+    (skill, re.compile(r'(?<![\w.+#])' + re.escape(skill) + r'(?![\w+#])', re.I)) for skill in SKILL_KEYWORDS
+]
+
+
+def normalize_text(text):
+    """
+    Collapse whitespace and drop empty lines so equivalent job descriptions hash the same.
+    """
+    lines = (re.sub(r'[ \t ]+', ' ', line).strip() for line in (text or '').splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def _parse_years(text):
+    match = _RANGE_RE.search(text)
+    if match:
+        return float(match.group(1)), float(match.group(2))
+    for pattern in (_OPEN_RE, _MIN_RE, _PLAIN_RE):
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1)), None
+    return None, None
+
+
+def _parse_title(text):
+    # Returns (title, source); only an 'explicit' title comes from a "Job title:"/"Position:" line
+    for source, pattern in (('explicit', _TITLE_RE), ('hiring', _HIRING_RE)):
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip(' -–,.'), source
+    first_line = text.split('\n', 1)[0].strip()
+    if first_line and len(first_line.split()) <= 6 and not first_line.endswith('.'):
+        return first_line, 'first_line'
+    return None, None
+
+
+def _parse_skills(text):
+    skills = []
+    seen = set()
+
+    def add(skill):
+        key = skill.lower()
+        if key not in seen:
+            seen.add(key)
+            skills.append(skill)
+
+    for heading in _SKILLS_HEADING_RE.finditer(text):
+        section = text[heading.end():heading.end() + 600]
+        for item in _SKILL_SPLIT_RE.split(section):
+            item = _SKILL_FILLER_RE.sub('', item.strip(' .:-–*')).strip()
+            if 2 <= len(item) <= 40 and len(item.split()) <= 4:
+                add(item)
+    for skill, pattern in _SKILL_KEYWORD_RES:
+        if pattern.search(text) and not any(pattern.search(listed) for listed in skills):
+            add(skill)
+    return skills[:30]
+
+
+def _parse_education(text):
+    education = []
+    for match in _EDUCATION_RE.finditer(text):
+        item = match.group(1).strip(' ,')
+        if item.lower() not in (e.lower() for e in education):
+            education.append(item)
+    return education[:3]
+
+
+def parse_job_description(text):
+    """
+    Extract the structured requirements (title, years, skills, education) from a job description.
+
+    `title_source` tells how reliable the title is: only 'explicit' titles
+    come from a labelled line; the others are guesses.
+    """
+    text = normalize_text(text)
+    min_years, max_years = _parse_years(text)
+    title, title_source = _parse_title(text)
+    return {
+        'required_title': title,
+        # 'explicit', 'hiring' ("we are looking for a ..."), 'first_line' or None
+        'title_source': title_source,
+        'min_years': min_years,
+        'max_years': max_years,
+        'required_skills': _parse_skills(text),
+        'education': _parse_education(text),
+    }
+
+
+def _format_years(value):
+    return f"{value:g}"
+
+
+def render_job_profile(profile, text):
+    """
+    Render the compact job requirements that replace the full job description in the prompts.
+    """
+    lines = []
+    explicit_title = profile.get('title_source') == 'explicit'
+    if profile.get('required_title'):
+        label = "Required job title" if explicit_title else "Likely job title"
+        lines.append(f"{label}: {profile['required_title']}")
+    if profile.get('min_years') is not None:
+        if profile.get('max_years') is not None:
+            years = f"{_format_years(profile['min_years'])}-{_format_years(profile['max_years'])} years"
+        else:
+            years = f"{_format_years(profile['min_years'])}+ years"
+        lines.append(f"Required experience: {years}")
+    if profile.get('required_skills'):
+        lines.append(f"Required skills: {', '.join(profile['required_skills'])}")
+    if profile.get('education'):
+        lines.append(f"Required education: {'; '.join(profile['education'])}")
+    if not profile.get('required_title') or profile.get('min_years') is None:
+        excerpt = normalize_text(text)[:PROFILE_EXCERPT_CHARS]
+        lines.append(f"Job description excerpt: {excerpt}")
+    elif not explicit_title:
+        # The title was guessed, so the model gets the start of the job description to check it
+        excerpt = normalize_text(text)[:PROFILE_TITLE_EXCERPT_CHARS]
+        lines.append(f"Job description excerpt: {excerpt}")
+    return '\n'.join(lines)
+
+
+def _init_store(conn):
+    global _initialized
+    if _initialized:
+        return
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS jd_artifacts (
+            text_hash TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            profile TEXT NOT NULL,
+            compact TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS jd_files (
+            file_hash TEXT PRIMARY KEY,
+            text_hash TEXT NOT NULL
+        );
+    """)
+    _initialized = True
+
+
+def _text_hash(text):
+    return hashlib.sha256(f"{PROFILE_VERSION}:{normalize_text(text)}".encode('utf-8')).hexdigest()
+
+
+def get_job_profile(text):
+    """
+    Return the artifact (text, profile, compact) for a job description text, parsing it only once.
+    """
+    text_hash = _text_hash(text)
+    with _profiles_lock:
+        artifact = _profiles.get(text_hash)
+    if artifact is not None:
+        return artifact
+
+    with closing(connect(JD_DB)) as conn:
+        _init_store(conn)
+        row = conn.execute(
+            "SELECT text, profile, compact FROM jd_artifacts WHERE text_hash = ?", (text_hash,)
+        ).fetchone()
+        if row is not None:
+            artifact = {'text': row['text'], 'profile': json.loads(row['profile']), 'compact': row['compact']}
+        else:
+            profile = parse_job_description(text)
+            artifact = {'text': text, 'profile': profile, 'compact': render_job_profile(profile, text)}
+            conn.execute(
+                "INSERT OR IGNORE INTO jd_artifacts (text_hash, text, profile, compact, created_at) VALUES (?, ?, ?, ?, ?)",
+                (text_hash, text, json.dumps(profile), artifact['compact'], time.time())
+            )
+            logging.info(f"Parsed job description {text_hash[:12]}: {profile}")
+
+    with _profiles_lock:
+        _profiles[text_hash] = artifact
+    return artifact
+
+
+def load_job_description(data, filename, extract):
+    """
+    Return the artifact of an uploaded job description, extracting its text only the first time it is seen.
+
+    `extract(data, filename)` is the text extraction function used on a cache miss.
+    """
+    file_hash = hashlib.sha256(data).hexdigest()
+
+    with closing(connect(JD_DB)) as conn:
+        _init_store(conn)
+        row = conn.execute(
+            "SELECT a.text FROM jd_files f JOIN jd_artifacts a ON a.text_hash = f.text_hash WHERE f.file_hash = ?",
+            (file_hash,)
+        ).fetchone()
+    if row is not None:
+        return get_job_profile(row['text'])
+
+    artifact = get_job_profile(extract(data, filename))
+    with closing(connect(JD_DB)) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO jd_files (file_hash, text_hash) VALUES (?, ?)",
+            (file_hash, _text_hash(artifact['text']))
+        )
+    return artifact
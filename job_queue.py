@@ -0,0 +1,354 @@
+import os
+import json
+import time
+import uuid
+import socket
+import logging
+import threading
+from contextlib import closing
+
+from storage import connect
+
+QUEUE_DB = 'job_queue.sqlite3'
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', '1'))
+POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '1'))
+STALE_AFTER = float(os.getenv('JOB_STALE_SECONDS', '900'))
+
+_workers = []
+_workers_lock = threading.Lock()
+# Wakes up streams in this process as soon as a resume or job finishes
+_updates = threading.Condition()
+
+
+def init_queue():
+    """
+    Create the job queue tables if they do not exist yet.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                job_description TEXT NOT NULL,
+                mode TEXT,
+                owner TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                heartbeat_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at);
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                filename TEXT NOT NULL,
+                resume_text TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                finished_at REAL,
+                duplicate_of INTEGER,
+                PRIMARY KEY (job_id, idx)
+            );
+        """)
+        _add_missing_columns(conn, 'jobs', {'mode': 'TEXT'})
+        _add_missing_columns(conn, 'job_items', {'duplicate_of': 'INTEGER'})
+
+
+def _add_missing_columns(conn, table, columns):
+    # Upgrade queue databases created by an older version of this module
+    existing = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, definition in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
+def enqueue_job(job_description, resumes, mode=None):
+    """
+    Queue a screening job for a list of (filename, resume_text) pairs and return its id.
+    """
+    job_id = uuid.uuid4().hex
+    with closing(connect(QUEUE_DB)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "INSERT INTO jobs (id, status, job_description, mode, created_at) VALUES (?, 'queued', ?, ?, ?)",
+            (job_id, job_description, mode, time.time())
+        )
+        conn.executemany(
+            "INSERT INTO job_items (job_id, idx, filename, resume_text, status) VALUES (?, ?, ?, ?, 'pending')",
+            [(job_id, idx, filename, resume_text) for idx, (filename, resume_text) in enumerate(resumes)]
+        )
+        conn.execute("COMMIT")
+    logging.info(f"Queued screening job {job_id} with {len(resumes)} resumes.")
+    return job_id
+
+
+def _owner():
+    # Identifies the process that owns a running job, used to recover jobs after a restart
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job():
+    """
+    Atomically mark the oldest queued job as running for this process and return it.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+        ).fetchone()
+        if row is None:
+            conn.execute("COMMIT")
+            return None
+        conn.execute(
+            "UPDATE jobs SET status = 'running', owner = ?, heartbeat_at = ? WHERE id = ?",
+            (_owner(), time.time(), row['id'])
+        )
+        conn.execute("COMMIT")
+        return dict(row)
+
+
+def pending_items(job_id):
+    """
+    Return the items of a job that have not been screened yet.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        rows = conn.execute(
+            "SELECT idx, filename, resume_text FROM job_items WHERE job_id = ? AND status = 'pending' ORDER BY idx",
+            (job_id,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def complete_item(job_id, idx, result=None, error=None, duplicate_of=None):
+    """
+    Store the outcome of one screened resume and refresh the job heartbeat.
+
+    `duplicate_of` is the idx of the near-duplicate resume of the job whose screening was reused.
+    """
+    now = time.time()
+    with closing(connect(QUEUE_DB)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(
+            "UPDATE job_items SET status = ?, result = ?, error = ?, finished_at = ?, duplicate_of = ? "
+            "WHERE job_id = ? AND idx = ?",
+            ('done' if error is None else 'failed',
+             json.dumps(result) if result is not None else None,
+             str(error) if error is not None else None,
+             now, duplicate_of, job_id, idx)
+        )
+        conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (now, job_id))
+        conn.execute("COMMIT")
+    _notify()
+
+
+def skip_items(job_id, idxs, reason):
+    """
+    Mark resumes of a job that will not be screened (e.g. left out of the shortlist) as skipped.
+    """
+    now = time.time()
+    with closing(connect(QUEUE_DB)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "UPDATE job_items SET status = 'skipped', error = ?, finished_at = ? WHERE job_id = ? AND idx = ?",
+            [(reason, now, job_id, idx) for idx in idxs]
+        )
+        conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (now, job_id))
+        conn.execute("COMMIT")
+    _notify()
+
+
+def finish_job(job_id, error=None):
+    """
+    Mark a job as done, or as failed with an error message.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, heartbeat_at = ? WHERE id = ?",
+            ('done' if error is None else 'failed', str(error) if error is not None else None, time.time(), job_id)
+        )
+    _notify()
+
+
+def _notify():
+    with _updates:
+        _updates.notify_all()
+
+
+def wait_for_update(timeout):
+    """
+    Block until a job handled by this process makes progress, or `timeout` seconds pass.
+
+    Jobs handled by other processes only show up once the timeout expires, so
+    callers should re-read the queue either way.
+    """
+    with _updates:
+        _updates.wait(timeout)
+
+
+def job_results(job_id):
+    """
+    Return (idx, result) pairs for all successfully screened resumes of a job, in upload order.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        rows = conn.execute(
+            "SELECT idx, result FROM job_items WHERE job_id = ? AND status = 'done' ORDER BY idx",
+            (job_id,)
+        ).fetchall()
+    return [(row['idx'], json.loads(row['result'])) for row in rows]
+
+
+def job_duplicates(job_id):
+    """
+    Return {idx: idx of the resume it duplicates} for the screened near-duplicates of a job.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        rows = conn.execute(
+            "SELECT idx, duplicate_of FROM job_items WHERE job_id = ? AND status = 'done' AND duplicate_of IS NOT NULL",
+            (job_id,)
+        ).fetchall()
+    return {row['idx']: row['duplicate_of'] for row in rows}
+
+
+def finished_items(job_id, since=0.0):
+    """
+    Return the screened, failed or skipped items of a job that finished at or after `since`, oldest first.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        rows = conn.execute(
+            "SELECT idx, filename, status, result, error, finished_at FROM job_items "
+            "WHERE job_id = ? AND status != 'pending' AND finished_at >= ? ORDER BY finished_at, idx",
+            (job_id, since)
+        ).fetchall()
+    return [{
+        'idx': row['idx'],
+        'filename': row['filename'],
+        'status': row['status'],
+        'result': json.loads(row['result']) if row['result'] else None,
+        'error': row['error'],
+        'finished_at': row['finished_at'],
+    } for row in rows]
+
+
+def get_job_summary(job_id):
+    """
+    Return a job's status and item counts without loading its items, or None if unknown.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        row = conn.execute(
+            "SELECT j.status, j.error, COUNT(i.idx) AS total, "
+            "COALESCE(SUM(i.status != 'pending'), 0) AS completed, COALESCE(SUM(i.status = 'failed'), 0) AS failed, "
+            "COALESCE(SUM(i.status = 'skipped'), 0) AS skipped "
+            "FROM jobs j LEFT JOIN job_items i ON i.job_id = j.id WHERE j.id = ? GROUP BY j.id",
+            (job_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    return {'job_id': job_id, **dict(row)}
+
+
+def get_job_status(job_id):
+    """
+    Return the progress of a job with per-resume status and partial results, or None if unknown.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        job = conn.execute("SELECT id, status, error, created_at FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if job is None:
+            return None
+        items = conn.execute(
+            "SELECT idx, filename, status, result, error FROM job_items WHERE job_id = ? ORDER BY idx",
+            (job_id,)
+        ).fetchall()
+    resumes = [{
+        'filename': item['filename'],
+        'status': item['status'],
+        'result': json.loads(item['result']) if item['result'] else None,
+        'error': item['error'],
+    } for item in items]
+    return {
+        'job_id': job['id'],
+        'status': job['status'],
+        'error': job['error'],
+        'total': len(resumes),
+        'completed': sum(1 for r in resumes if r['status'] != 'pending'),
+        'failed': sum(1 for r in resumes if r['status'] == 'failed'),
+        'skipped': sum(1 for r in resumes if r['status'] == 'skipped'),
+        'resumes': resumes,
+    }
+
+
+def ping():
+    """
+    Read the queue database, raising if it is missing or locked for too long.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        conn.execute("SELECT 1 FROM jobs LIMIT 1").fetchall()
+
+
+def _owner_is_dead(owner):
+    host, _, pid = (owner or '').rpartition(':')
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def requeue_interrupted_jobs(startup=False):
+    """
+    Put running jobs back in the queue when their owner process died or stopped reporting.
+
+    On startup nothing has been claimed yet, so jobs recorded under this very
+    process id (e.g. pid 1 in a restarted container) are also stale. Items that
+    already finished keep their results, so a resumed job only screens what is left.
+    """
+    with closing(connect(QUEUE_DB)) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        rows = conn.execute("SELECT id, owner, heartbeat_at FROM jobs WHERE status = 'running'").fetchall()
+        stale = [
+            row['id'] for row in rows
+            if (startup and row['owner'] == _owner()) or _owner_is_dead(row['owner']) or (row['heartbeat_at'] or 0) < time.time() - STALE_AFTER
+        ]
+        conn.executemany("UPDATE jobs SET status = 'queued', owner = NULL WHERE id = ?", [(job_id,) for job_id in stale])
+        conn.execute("COMMIT")
+    for job_id in stale:
+        logging.warning(f"Requeued interrupted screening job {job_id}.")
+    return stale
+
+
+def _worker_loop(handler):
+    while True:
+        try:
+            job = claim_next_job()
+            if job is None:
+                requeue_interrupted_jobs()
+                time.sleep(POLL_INTERVAL)
+                continue
+            logging.info(f"Processing screening job {job['id']}.")
+            try:
+                handler(job)
+                finish_job(job['id'])
+            except Exception as e:
+                logging.error(f"Screening job {job['id']} failed: {e}", exc_info=True)
+                finish_job(job['id'], error=e)
+        except Exception as e:
+            logging.error(f"Job queue worker error: {e}", exc_info=True)
+            time.sleep(POLL_INTERVAL)
+
+
+def start_workers(handler, count=None):
+    """
+    Start background worker threads (once per process) that run `handler(job)` for queued jobs.
+    """
+    with _workers_lock:
+        if _workers:
+            return
+        init_queue()
+        requeue_interrupted_jobs(startup=True)
+        for i in range(count or JOB_WORKERS):
+            worker = threading.Thread(target=_worker_loop, args=(handler,), name=f'job-worker-{i}', daemon=True)
+            worker.start()
+            _workers.append(worker)
@@ -1,18 +1,19 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
-from flask_mysqldb import MySQL
-from sqlalchemy import create_engine
-from urllib.parse import quote_plus
+from flask import Flask, Response, render_template, request, redirect, url_for, session, flash, jsonify, stream_with_context
 from dotenv import load_dotenv
-import mysql.connector
 import json
-from new_test import extract_text, clean_output, crew, summarization_task, interview_task, evaluation_task, editor_task, output_parser_task
+from new_test import PIPELINES, DEFAULT_MODE, start_warm_up, pipelines_ready
+from screening import screen_resumes
+import job_queue
+import db
+import metrics
+import jd_store
+from extraction import extract_many, extract_bytes, SUPPORTED_EXTENSIONS
+from upload_store import store_upload, touch_upload, start_sweeper
+from result_cache import cache_stats
+from shortlist import shortlist, SHORTLIST_TOP_N
 import os
-import pandas as pd
-import uuid
-import tempfile
 import logging
-import json
-import datetime, traceback
+import time
 
 # Flask app configuration
 app = Flask(__name__)
@@ -23,62 +24,26 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Limit file size to 16 MB
 app.secret_key = 'a_super_secret_key_12345'  # Use a secure random string
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+# Configure logging (LOG_LEVEL=DEBUG for troubleshooting)
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+logging.basicConfig(level=LOG_LEVEL, format='%(asctime)s - %(process)d - %(levelname)s - %(message)s')
 
 # Load environment variables
 load_dotenv()
 
-# MySQL Configuration
-app.config['MYSQL_HOST'] = os.getenv("MYSQL_HOST")
-app.config['MYSQL_USER'] = os.getenv("MYSQL_USER")
-app.config['MYSQL_PASSWORD'] = os.getenv("MYSQL_PASSWORD")
-app.config['MYSQL_DB'] = os.getenv("MYSQL_DB")
-app.config['MYSQL_CURSORCLASS'] = 'DictCursor'
-
-mysql = MySQL(app)
-
-def insert_results_into_db(results):
-    try:
-        cur = mysql.connection.cursor()
-        for resume_list in results:
-            for resume in resume_list:
-                cur.execute("""
-                    INSERT INTO hr_resume_results (
-                        candidate_name,
-                        overall_score,
-                        tag,
-                        explanation,
-                        feedback
-                    ) VALUES (%s, %s, %s, %s, %s)
-                """, (
-                    resume.get('candidate_name'),
-                    resume.get('overall_score'),
-                    resume.get('tag'),
-                    resume.get('explanation'),
-                    resume.get('feedback')
-                ))
-        mysql.connection.commit()
-        cur.close()
-        print("✅ All results inserted successfully into the database.")
-    except Exception as e:
-        print("❌ Error inserting results:")
-        traceback.print_exc()
+# The database is reached through the pooled engine in db.py (MYSQL_* settings or DATABASE_URL);
+# results are written per resume by process_screening_job
 
-
-def save_file(file, upload_folder):
+def read_upload(file):
     """
-    Save an uploaded file to the specified folder and return the file path.
+    Read an uploaded file from its request stream and return the bytes, without touching the disk.
     """
     try:
         if not file or file.filename == '':
             raise ValueError("File is missing.")
-        file_path = os.path.join(upload_folder, file.filename)
-        file.save(file_path)
-        logging.info(f"File saved at: {file_path}")
-        return file_path
+        return file.read()
     except Exception as e:
-        logging.error(f"Error saving file: {e}")
+        logging.error(f"Error reading upload: {e}")
         raise
 
 def read_temp_file(file_path):
@@ -92,6 +57,84 @@ def read_temp_file(file_path):
         logging.error(f"Error reading temporary file: {e}")
         raise
 
+def process_screening_job(job):
+    """
+    Screen the pending resumes of a queued job and publish its results.
+
+    Runs on a background worker. Every finished resume is stored in the job
+    queue right away, so an interrupted job resumes with the remaining ones.
+    """
+    items = job_queue.pending_items(job['id'])
+    if SHORTLIST_TOP_N and len(items) > SHORTLIST_TOP_N:
+        # Only the resumes closest to the job description go through the crew
+        picked = shortlist([item['resume_text'] for item in items], job['job_description'])
+        selected = set(picked.selected)
+        job_queue.skip_items(job['id'], [item['idx'] for index, item in enumerate(items) if index not in selected],
+                             f"Not in the top {SHORTLIST_TOP_N} of the shortlist")
+        logging.info(f"Shortlisted {len(selected)} of {len(items)} resumes for job {job['id']} ({picked.backend})")
+        items = [items[index] for index in sorted(selected)]
+    resumes = [(item['filename'], item['resume_text']) for item in items]
+
+    # Each job writes its own screening run, so concurrent batches never touch each other's results
+    run_id = job['id']
+
+    def resume_key(idx):
+        return f"{run_id}:{idx}"
+
+    def publish_finished():
+        # The job queue remembers which resumes were near-duplicates, so they stay grouped when republished
+        duplicates = {resume_key(idx): resume_key(first) for idx, first in job_queue.job_duplicates(job['id']).items()}
+        db.upsert_results(run_id, [(resume_key(idx), result) for idx, result in job_queue.job_results(job['id'])],
+                          duplicates)
+
+    missed_writes = []
+
+    def on_result(index, outcome):
+        idx = items[index]['idx']
+        first = items[outcome.duplicate_of]['idx'] if outcome.duplicate_of is not None else None
+        job_queue.complete_item(job['id'], idx, outcome.result, outcome.error, first)
+        if outcome.error is None:
+            # Each resume shows up in the results table as soon as it is screened
+            duplicates = {resume_key(idx): resume_key(first)} if first is not None else None
+            try:
+                db.upsert_results(run_id, [(resume_key(idx), outcome.result)], duplicates)
+            except Exception as e:
+                logging.error(f"Error storing result for {outcome.filename}: {e}")
+                missed_writes.append(idx)
+
+    db.start_run(run_id, job['mode'])
+    try:
+        # Publish what a resumed job already finished in one batch
+        publish_finished()
+
+        # Screen the batch concurrently, results come back in upload order
+        logging.info(f"Processing {len(resumes)} resumes for job {job['id']}")
+        outcomes = screen_resumes(resumes, job['job_description'], on_result=on_result, mode=job['mode'])
+        logging.info(f"Result cache stats: {cache_stats()}")
+        metrics.write_run_report(run_id, outcomes)
+
+        if missed_writes:
+            # Upserts are idempotent, so republishing the whole job fills any gaps
+            publish_finished()
+    except Exception as e:
+        # Record the run as failed rather than leaving it running; the job queue keeps the error
+        try:
+            db.finish_run(run_id, error=e)
+        except Exception as finish_error:
+            logging.error(f"Error marking run {run_id} as failed: {finish_error}")
+        raise
+    db.finish_run(run_id)
+
+
+@app.before_request
+def ensure_job_workers():
+    # Started on the first request so only the serving process runs workers
+    job_queue.start_workers(process_screening_job)
+    start_sweeper(app.config['UPLOAD_FOLDER'])
+    # The crews are built lazily; get the slow imports done before the first screening needs them
+    start_warm_up()
+
+
 @app.route('/', methods=['GET', 'POST'])
 def home():
     error = None
@@ -105,63 +148,56 @@ def home():
                 job_desc_file = request.files.get('job_desc')
                 if not job_desc_file or job_desc_file.filename == '':
                     raise ValueError("Job description file is required.")
-                job_desc_path = save_file(job_desc_file, app.config['UPLOAD_FOLDER'])
+                job_desc_data = read_upload(job_desc_file)
+                # Kept on disk under its content hash so it can be retained for the next upload
+                job_desc_path = store_upload(job_desc_data, job_desc_file.filename, app.config['UPLOAD_FOLDER'])
                 session['job_description_file'] = job_desc_path  # Save job description file path in session
                 session['file_name'] = job_desc_file.filename
             else:
                 logging.info("Reusing existing job description.")
+                job_desc_path = session['job_description_file']
+                with open(job_desc_path, 'rb') as f:
+                    job_desc_data = f.read()
+                touch_upload(job_desc_path)
 
-            print("Job description file path:", session.get('job_description_file'))
+            logging.debug(f"Job description file path: {session.get('job_description_file')}")
             
             # Process multiple resumes
             resume_files = request.files.getlist('resumes')  # Get list of resume files
             if not resume_files or all(file.filename == '' for file in resume_files):
                 raise ValueError("At least one resume file is required.")
 
-            # Store results for all resumes
-            all_results = []
-            job_description_path = session.get('job_description_file')
-            job_description = extract_text(job_description_path)
-
-            # 🔄 Clear existing results before inserting new ones
-            cur = mysql.connection.cursor()
-            cur.execute("TRUNCATE TABLE hr_resume_results")
-            mysql.connection.commit()
-            cur.close()
-            logging.info("🔄 Cleared previous results from hr_resume_results.")
-
+            job_description = jd_store.load_job_description(job_desc_data, session['file_name'], extract_bytes)['text']
 
+            uploads = []
             for resume_file in resume_files:
-                if resume_file.filename != '':
-                    resume_path = save_file(resume_file, app.config['UPLOAD_FOLDER'])
-                if not resume_file.filename.lower().endswith(('.pdf', '.docx', '.txt')):
-                    print(f"Skipping unsupported file format: {resume_file.filename}")
+                if resume_file.filename == '':
                     continue
+                if not resume_file.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                    logging.warning(f"Skipping unsupported file format: {resume_file.filename}")
+                    continue
+                uploads.append((resume_file.filename, read_upload(resume_file)))
 
-                print(f"\nProcessing resume: {resume_file.filename}")
-                try:
-                    resume_text = extract_text(resume_path)
-
-                    result = crew.kickoff(inputs={
-                        "resume": resume_text,
-                        "job_description": job_description
-                    })                    
-
-                    parsed_output = clean_output(output_parser_task.output.raw)
-
-                    # # ⬇️ Store into all_results
-                    try:
-                        all_results.append(json.loads(parsed_output))
-                    except json.JSONDecodeError as e:
-                            print(f"⚠️ Failed to parse JSON for {resume_file.filename}: {e}")
-                            continue
+            # Extract the whole batch from memory in parallel worker processes
+            resumes = []
+            texts = extract_many(uploads)
+            for (filename, _), text in zip(uploads, texts):
+                if isinstance(text, Exception):
+                    logging.error(f"Error processing {filename}: {text}")
+                    continue
+                resumes.append((filename, text))
 
-                except Exception as e:
-                    print(f"Error processing {resume_file.filename}: {e}")
+            mode = request.form.get('mode') or DEFAULT_MODE
+            if mode not in PIPELINES:
+                raise ValueError(f"Unknown screening mode: {mode}")
 
-            insert_results_into_db(all_results)
+            # Hand the batch to the background workers and return right away
+            job_id = job_queue.enqueue_job(job_description, resumes, mode)
+            session['job_id'] = job_id
 
-            return redirect(url_for('results'))
+            if request.accept_mimetypes.best == 'application/json':
+                return jsonify(job_id=job_id, status_url=url_for('job_status', job_id=job_id)), 202
+            return redirect(url_for('job_progress', job_id=job_id))
 
     except ValueError as ve:
         error = str(ve)  # Specific error message for validation errors
@@ -173,23 +209,186 @@ def home():
     # Render the home page with error messages if any
     return render_template('base1.html', error=error, 
                            current_job_desc=session.get('job_description_file'),
-                           current_file_name=session.get('file_name'))
+                           current_file_name=session.get('file_name'),
+                           default_mode=DEFAULT_MODE)
 
-@app.route('/results')
-def results():
+@app.route('/metrics')
+def prometheus_metrics():
+    # Every worker adds its metrics to a store in the data directory, so any of them can answer a scrape
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/healthz')
+def health():
+    # Liveness: the process is up and serving requests
+    return jsonify(status='ok')
+
+
+@app.route('/readyz')
+def readiness():
+    """
+    Report whether this worker should receive traffic: storage answers and the screening pipelines are built.
+    """
+    checks = {}
+    for name, check in (('database', db.ping), ('job_queue', job_queue.ping)):
+        try:
+            check()
+            checks[name] = 'ok'
+        except Exception as e:
+            logging.warning(f"Readiness check {name} failed: {e}")
+            checks[name] = 'unavailable'
+    checks['pipelines'] = 'ok' if pipelines_ready() else 'warming up'
+    ready = all(value == 'ok' for value in checks.values())
+    return jsonify(status='ready' if ready else 'not ready', checks=checks), 200 if ready else 503
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    status = job_queue.get_job_status(job_id)
+    if status is None:
+        return jsonify(error="Unknown job."), 404
+    if status['status'] == 'done':
+        status['redirect'] = url_for('results', run_id=job_id)
+    return jsonify(status)
+
+# How long a results stream waits for progress before re-reading the queue and sending a keep-alive
+STREAM_POLL_INTERVAL = float(os.getenv('STREAM_POLL_INTERVAL', '1'))
+STREAM_KEEPALIVE = float(os.getenv('STREAM_KEEPALIVE_SECONDS', '15'))
+
+
+def sse_event(event, data, event_id=None):
+    """
+    Format one server-sent event.
+    """
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return "\n".join(lines) + "\n\n"
+
+
+@app.route('/jobs/<job_id>/stream')
+def job_stream(job_id):
+    """
+    Stream each screened resume of a job as a server-sent event as soon as it finishes.
+
+    A reconnecting browser sends back the id of the last event it received
+    and the stream resumes from there; the stream ends once the job is done.
+    """
+    summary = job_queue.get_job_summary(job_id)
+    if summary is None:
+        return jsonify(error="Unknown job."), 404
     try:
-        cur = mysql.connection.cursor()
-        cur.execute("SELECT candidate_name, overall_score, tag, explanation, feedback FROM hr_resume_results ORDER BY overall_score DESC")
-        results = cur.fetchall()
-        cur.close()
+        since = float(request.headers.get('Last-Event-ID') or 0)
+    except ValueError:
+        since = 0.0
+    redirect_url = url_for('results', run_id=job_id)
+
+    def generate():
+        nonlocal since
+        sent = set()
+        last_write = time.monotonic()
+        yield sse_event('status', summary)
+        while True:
+            summary_now = job_queue.get_job_summary(job_id)
+            # Items finishing in the same instant as the last event are sent once
+            for item in job_queue.finished_items(job_id, since):
+                if item['idx'] in sent:
+                    continue
+                sent.add(item['idx'])
+                since = item.pop('finished_at')
+                yield sse_event('result', item, event_id=repr(since))
+                last_write = time.monotonic()
+            if summary_now['status'] in ('done', 'failed'):
+                summary_now['redirect'] = redirect_url
+                yield sse_event('done', summary_now)
+                return
+            if time.monotonic() - last_write >= STREAM_KEEPALIVE:
+                yield ": keep-alive\n\n"
+                last_write = time.monotonic()
+            job_queue.wait_for_update(STREAM_POLL_INTERVAL)
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/jobs/<job_id>/progress')
+def job_progress(job_id):
+    return render_template('progress1.html', job_id=job_id)
+
+RESULTS_PAGE_SIZE = int(os.getenv('RESULTS_PAGE_SIZE', '50'))
+RESULTS_MAX_PAGE_SIZE = 200
+
+
+def results_query_args():
+    """
+    Read the paging and filter arguments shared by the results page and its JSON API.
+    """
+    def optional_int(name):
+        value = request.args.get(name, '').strip()
+        if not value:
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a whole number.")
+
+    after = request.args.get('after') or None
+    if after:
+        try:
+            db.decode_cursor(after)
+        except ValueError:
+            raise ValueError("Invalid page cursor.")
+    limit = optional_int('limit') or RESULTS_PAGE_SIZE
+    return {
+        'limit': max(1, min(limit, RESULTS_MAX_PAGE_SIZE)),
+        'after': after,
+        'tag': request.args.get('tag') or None,
+        'min_score': optional_int('min_score'),
+        'max_score': optional_int('max_score'),
+    }
 
-        print(results)
 
-        return render_template('result1.html', results=results)
+@app.route('/results')
+def results():
+    # Show the run this browser started last, unless a run is named explicitly
+    run_id = request.args.get('run_id') or session.get('job_id')
+    filters = {name: request.args.get(name, '') for name in ('tag', 'min_score', 'max_score')}
+    if not run_id:
+        return render_template('result1.html', results=[], filters=filters,
+                               error="No screening run yet. Upload resumes to start one.")
+    try:
+        args = results_query_args()
+        # Near-duplicate resumes are shown under the one that was screened
+        results, next_cursor = db.fetch_results_page(run_id, group_duplicates=True, **args)
+        active_filters = {name: value for name, value in filters.items() if value}
+        if request.args.get('limit'):
+            active_filters['limit'] = args['limit']
+        return render_template('result1.html', results=results, run_id=run_id, filters=filters,
+                               next_url=url_for('results', run_id=run_id, after=next_cursor, **active_filters) if next_cursor else None,
+                               first_url=url_for('results', run_id=run_id, **active_filters) if args['after'] else None)
+    except ValueError as ve:
+        return render_template('result1.html', results=[], run_id=run_id, filters=filters, error=str(ve))
     except Exception as e:
         logging.error(f"Error fetching results: {e}")
-        return render_template('result1.html', results=[], error="Failed to load results.")
+        return render_template('result1.html', results=[], run_id=run_id, filters=filters, error="Failed to load results.")
+
+@app.route('/runs/<run_id>/results')
+def run_results_api(run_id):
+    try:
+        args = results_query_args()
+    except ValueError as ve:
+        return jsonify(error=str(ve)), 400
+    if db.get_run(run_id) is None:
+        return jsonify(error="Unknown run."), 404
+    results, next_cursor = db.fetch_results_page(run_id, **args)
+    return jsonify(run_id=run_id, results=results, next_cursor=next_cursor)
+
+@app.route('/runs/<run_id>/results/<int:result_id>')
+def run_result_details(run_id, result_id):
+    result = db.fetch_result_details(run_id, result_id)
+    if result is None:
+        return jsonify(error="Unknown result."), 404
+    return jsonify(result)
     
 if __name__ == "__main__":
-    # Start the Flask application
-    app.run(host='0.0.0.0', debug=True, port=8000)
\ No newline at end of file
+    # Development server only; production runs under gunicorn (see gunicorn.conf.py)
+    app.run(host='0.0.0.0', debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true', port=int(os.getenv('PORT', '8000')))
@@ -0,0 +1,326 @@
+import json
+import time
+import bisect
+import logging
+import sqlite3
+import datetime
+import threading
+from contextlib import closing
+from collections import defaultdict
+
+from storage import connect, data_path
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+TOKEN_KINDS = ('prompt_tokens', 'completion_tokens')
+
+# Metrics of every process using the data directory (gunicorn workers, batch runs) add up here
+METRICS_DB = 'metrics.sqlite3'
+
+_lock = threading.Lock()
+# Increments recorded by this process since the last flush, by (metric, labels, field)
+_pending = defaultdict(float)
+_initialized = False
+_init_lock = threading.Lock()
+
+_METRICS = {
+    'hr_screenings_total': ('counter', 'Resumes screened, by pipeline mode and how the result was produced.'),
+    'hr_screening_retries_total': ('counter', 'Crew runs retried after an OpenAI rate limit.'),
+    'hr_screening_seconds': ('histogram', 'Wall time to screen one resume.'),
+    'hr_task_seconds': ('histogram', 'Wall time of one crew task for one resume.'),
+    'hr_task_tokens_total': ('counter', 'LLM tokens used by crew tasks.'),
+    'hr_task_llm_requests_total': ('counter', 'LLM requests made by crew tasks.'),
+    'hr_task_retries_total': ('counter', 'Crew task retries after failed output validation.'),
+    'hr_task_skipped_total': ('counter', 'Conditional crew tasks skipped.'),
+    'hr_resume_tokens_total': ('counter', 'Resume tokens before (original) and after (prompt) normalization.'),
+    'hr_output_repairs_total': ('counter', 'Screening outputs fixed locally, by kind of repair.'),
+    'hr_output_parse_failures_total': ('counter', 'Screening outputs that could not be parsed or validated, even after repairs.'),
+    'hr_output_parser_retries_total': ('counter', 'Re-runs of the final crew task after unusable output.'),
+    'hr_wasted_tokens_total': ('counter', 'LLM tokens spent on screenings that ended without a result.'),
+}
+
+
+def _key(name, labels):
+    return name, json.dumps(sorted(labels.items()))
+
+
+def inc(name, value=1, **labels):
+    """
+    Add `value` to a counter.
+    """
+    with _lock:
+        _pending[_key(name, labels) + ('value',)] += value
+
+
+def observe(name, value, **labels):
+    """
+    Record one observation in a histogram.
+    """
+    key = _key(name, labels)
+    index = bisect.bisect_left(LATENCY_BUCKETS, value)
+    with _lock:
+        if index < len(LATENCY_BUCKETS):
+            _pending[key + (f"bucket:{index}",)] += 1
+        _pending[key + ('count',)] += 1
+        _pending[key + ('sum',)] += value
+
+
+def _init_store(conn):
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS metric_values (
+                name TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                field TEXT NOT NULL,
+                value REAL NOT NULL,
+                PRIMARY KEY (name, labels, field)
+            ) WITHOUT ROWID
+        """)
+        _initialized = True
+
+
+def flush():
+    """
+    Add the metrics recorded by this process since the last flush to the shared store.
+    """
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return
+    try:
+        with closing(connect(METRICS_DB)) as conn:
+            _init_store(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT INTO metric_values (name, labels, field, value) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (name, labels, field) DO UPDATE SET value = value + excluded.value",
+                [key + (value,) for key, value in pending.items()]
+            )
+            conn.execute("COMMIT")
+    except sqlite3.Error as e:
+        # Kept for the next flush rather than lost
+        with _lock:
+            for key, value in pending.items():
+                _pending[key] += value
+        logging.warning(f"Could not write metrics to {METRICS_DB}: {e}")
+
+
+def _token_usage(agent):
+    usage = agent._token_process.get_summary()
+    return {
+        'prompt_tokens': usage.prompt_tokens,
+        'completion_tokens': usage.completion_tokens,
+        'requests': usage.successful_requests,
+    }
+
+
+class CrewSpan:
+    """
+    Collect per-task timings and token usage of one crew run.
+
+    Crews are reused across resumes and their agents count tokens
+    cumulatively, so counters are read before and after the run and the
+    difference is attributed to the task the agent ran.
+    """
+
+    def __init__(self, crew):
+        self.crew = crew
+        self.started_at = None
+        self.before = {}
+
+    def __enter__(self):
+        self.started_at = datetime.datetime.now()
+        self.before = {
+            id(task): (_token_usage(task.agent), task.retry_count) for task in self.crew.tasks
+        }
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def tasks(self):
+        """
+        Return one span per task of the crew for the run that just ended.
+        """
+        spans = []
+        for task in self.crew.tasks:
+            usage_before, retries_before = self.before[id(task)]
+            usage = _token_usage(task.agent)
+            # A skipped conditional task keeps the timestamps of an earlier run
+            ran = bool(task.start_time and task.start_time >= self.started_at and task.end_time)
+            spans.append({
+                'task': task.name,
+                'agent': task.agent.role,
+                'skipped': not ran,
+                'seconds': round((task.end_time - task.start_time).total_seconds(), 4) if ran else 0.0,
+                'prompt_tokens': usage['prompt_tokens'] - usage_before['prompt_tokens'],
+                'completion_tokens': usage['completion_tokens'] - usage_before['completion_tokens'],
+                'requests': usage['requests'] - usage_before['requests'],
+                'retries': task.retry_count - retries_before,
+            })
+        return spans
+
+
+def new_span(mode):
+    """
+    Start the span of one resume screening.
+    """
+    return {'mode': mode, 'outcome': None, 'seconds': 0.0, 'retries': 0, 'resume_tokens': None, 'parse': None,
+            'duplicate_of': None, 'tasks': [], '_started': time.perf_counter()}
+
+
+def finish_span(span, outcome):
+    """
+    Close a resume span, record it in the shared metrics and return it.
+
+    `outcome` is how the result was produced: 'llm', 'cached', 'prefiltered', 'near_duplicate'
+    (a cached result of a similar resume), 'duplicate' (shared with a similar resume of the batch) or 'error'.
+    """
+    span['outcome'] = outcome
+    span['seconds'] = round(time.perf_counter() - span.pop('_started'), 4)
+    mode = span['mode']
+    inc('hr_screenings_total', mode=mode, outcome=outcome)
+    observe('hr_screening_seconds', span['seconds'], mode=mode, outcome=outcome)
+    if span['retries']:
+        inc('hr_screening_retries_total', span['retries'], mode=mode)
+    if span['resume_tokens']:
+        for kind in ('original', 'prompt'):
+            inc('hr_resume_tokens_total', span['resume_tokens'][kind], mode=mode, kind=kind)
+    if outcome == 'error':
+        wasted = sum(task[kind] for task in span['tasks'] for kind in TOKEN_KINDS)
+        if wasted:
+            inc('hr_wasted_tokens_total', wasted, mode=mode)
+    for task in span['tasks']:
+        if task['skipped']:
+            inc('hr_task_skipped_total', mode=mode, task=task['task'])
+            continue
+        observe('hr_task_seconds', task['seconds'], mode=mode, task=task['task'])
+        for kind in TOKEN_KINDS:
+            inc('hr_task_tokens_total', task[kind], mode=mode, task=task['task'], kind=kind.replace('_tokens', ''))
+        inc('hr_task_llm_requests_total', task['requests'], mode=mode, task=task['task'])
+        if task['retries']:
+            inc('hr_task_retries_total', task['retries'], mode=mode, task=task['task'])
+    flush()
+    return span
+
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{name}="{str(value)}"' for name, value in items) + '}'
+
+
+def _format(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_prometheus():
+    """
+    Return the metrics of every process sharing the data directory in the Prometheus text exposition format.
+    """
+    flush()
+    with closing(connect(METRICS_DB)) as conn:
+        _init_store(conn)
+        rows = conn.execute("SELECT name, labels, field, value FROM metric_values").fetchall()
+
+    counters = {}
+    histograms = {}
+    for row in rows:
+        key = (row['name'], tuple(tuple(pair) for pair in json.loads(row['labels'])))
+        if row['field'] == 'value':
+            counters[key] = row['value']
+            continue
+        histogram = histograms.setdefault(key, {'buckets': [0] * len(LATENCY_BUCKETS), 'count': 0, 'sum': 0.0})
+        if row['field'].startswith('bucket:'):
+            histogram['buckets'][int(row['field'].split(':')[1])] = int(row['value'])
+        elif row['field'] == 'count':
+            histogram['count'] = int(row['value'])
+        else:
+            histogram['sum'] = row['value']
+
+    lines = []
+    for name, (kind, help_text) in _METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == 'counter':
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {_format(value)}")
+        else:
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, histogram['buckets']):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels, [('le', _format(bound))])} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {histogram['count']}")
+                lines.append(f"{name}_sum{_labels(labels)} {_format(round(histogram['sum'], 6))}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def summarize_spans(spans):
+    """
+    Aggregate resume spans into per-outcome counts, resume token savings, output repairs and per-task totals.
+    """
+    summary = {
+        'resumes': len(spans), 'seconds': 0.0, 'retries': 0, 'outcomes': defaultdict(int),
+        'resume_tokens': {'original': 0, 'prompt': 0, 'saved': 0, 'truncated': 0},
+        'parse': {'repaired': 0, 'parser_retries': 0}, 'tasks': {},
+    }
+    for span in spans:
+        summary['seconds'] += span['seconds']
+        summary['retries'] += span['retries']
+        summary['outcomes'][span['outcome']] += 1
+        resume_tokens = span.get('resume_tokens')
+        if resume_tokens:
+            summary['resume_tokens']['original'] += resume_tokens['original']
+            summary['resume_tokens']['prompt'] += resume_tokens['prompt']
+            summary['resume_tokens']['saved'] += resume_tokens['original'] - resume_tokens['prompt']
+            summary['resume_tokens']['truncated'] += int(resume_tokens['truncated'])
+        parse = span.get('parse')
+        if parse:
+            summary['parse']['repaired'] += int(bool(parse['repairs']))
+            summary['parse']['parser_retries'] += parse['retries']
+        for task in span['tasks']:
+            totals = summary['tasks'].setdefault(task['task'], {
+                'runs': 0, 'skipped': 0, 'seconds': 0.0, 'prompt_tokens': 0, 'completion_tokens': 0,
+                'requests': 0, 'retries': 0,
+            })
+            if task['skipped']:
+                totals['skipped'] += 1
+                continue
+            totals['runs'] += 1
+            for field in ('seconds', 'prompt_tokens', 'completion_tokens', 'requests', 'retries'):
+                totals[field] += task[field]
+    summary['seconds'] = round(summary['seconds'], 4)
+    summary['outcomes'] = dict(summary['outcomes'])
+    for totals in summary['tasks'].values():
+        totals['seconds'] = round(totals['seconds'], 4)
+    return summary
+
+
+def write_run_report(run_id, outcomes, path=None):
+    """
+    Write the spans of a screening run and their summary as JSON and return the file path.
+
+    Reports go to `<HR_DATA_DIR>/metrics/<run_id>.json` unless `path` is given.
+    """
+    spans = [dict(outcome.span, resume=outcome.filename) for outcome in outcomes if outcome.span]
+    report = {
+        'run_id': run_id,
+        'written_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'summary': summarize_spans(spans),
+        'spans': spans,
+    }
+    path = path or data_path('metrics', f"{run_id}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Screening metrics for run {run_id} written to {path}")
+    return path
@@ -0,0 +1,258 @@
+import os
+import re
+import logging
+import threading
+import unicodedata
+from collections import Counter, namedtuple
+
+# Bump when the normalization changes; it is part of the result cache key
+NORMALIZATION_VERSION = 'norm-1'
+NORMALIZE_ENABLED = os.getenv('RESUME_NORMALIZE_ENABLED', 'true').lower() == 'true'
+# Upper bound on the resume tokens pasted into the prompts
+TOKEN_BUDGET = int(os.getenv('RESUME_TOKEN_BUDGET', '3000'))
+# tiktoken encoding of the screening model (gpt-4o)
+TOKENIZER_ENCODING = os.getenv('RESUME_TOKENIZER_ENCODING', 'o200k_base')
+# Lines repeated at least this often are page headers or footers
+BOILERPLATE_MIN_REPEATS = int(os.getenv('RESUME_BOILERPLATE_MIN_REPEATS', '3'))
+
+TRUNCATION_MARK = '[...]'
+
+# Section headings, in the order their content matters to the screening prompts
+SECTION_PRIORITY = (
+    'header', 'summary', 'experience', 'skills', 'education', 'projects', 'certifications',
+    'achievements', 'publications', 'languages', 'interests', 'references',
+)
+# Sections left out entirely before anything useful is cut
+DROPPABLE_SECTIONS = ('interests', 'references')
+
+_SECTION_HEADINGS = {
+    'summary': ('summary', 'professional summary', 'profile', 'objective', 'career objective', 'about me', 'overview'),
+    'experience': ('experience', 'work experience', 'professional experience', 'employment', 'employment history',
+                   'work history', 'career history', 'internships', 'internship'),
+    'skills': ('skills', 'technical skills', 'key skills', 'core competencies', 'competencies', 'technologies',
+               'tools', 'skill set', 'tech stack'),
+    'education': ('education', 'academic background', 'academics', 'qualifications', 'educational qualifications'),
+    'projects': ('projects', 'personal projects', 'academic projects', 'key projects'),
+    'certifications': ('certifications', 'certificates', 'licenses', 'courses', 'training'),
+    'achievements': ('achievements', 'awards', 'honors', 'honours', 'accomplishments'),
+    'publications': ('publications', 'papers', 'patents'),
+    'languages': ('languages',),
+    'interests': ('interests', 'hobbies', 'hobbies and interests', 'extracurricular activities', 'activities'),
+    'references': ('references', 'referees', 'declaration'),
+}
+_HEADING_TO_SECTION = {heading: section for section, headings in _SECTION_HEADINGS.items() for heading in headings}
+
+_CONTROL_RE = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\u200b-\u200f\ufeff]')
+_SPACES_RE = re.compile(r'[ \t\xa0]+')
+_PAGE_NUMBER_RE = re.compile(r'^(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$', re.I)
+_HEADING_RE = re.compile(r'^[#\s]*([A-Za-z][A-Za-z &/]{1,40}?)\s*:?\s*$')
+
+PreparedResume = namedtuple('PreparedResume', ['text', 'original_tokens', 'tokens', 'sections', 'truncated'])
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    # tiktoken downloads its vocabulary on first use; without it the estimate below is used
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            except Exception as e:
+                logging.warning(f"tiktoken encoding {TOKENIZER_ENCODING} unavailable ({e}); estimating token counts.")
+                _encoding = False
+        return _encoding
+
+
+def count_tokens(text):
+    """
+    Count the tokens of a text with the model's tokenizer, or estimate them (about four characters per token).
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, (len(text) + 3) // 4)
+
+
+def normalize_whitespace(text):
+    """
+    Return the text with consistent unicode, no control characters, single spaces and at most one blank line in a row.
+    """
+    text = unicodedata.normalize('NFKC', text or '').replace('\r\n', '\n').replace('\r', '\n')
+    text = _CONTROL_RE.sub('', text)
+    lines = []
+    for line in text.split('\n'):
+        line = _SPACES_RE.sub(' ', line).strip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    return '\n'.join(lines).strip()
+
+
+def remove_boilerplate(text):
+    """
+    Drop page numbers, headers and footers repeated on every page, and paragraphs that appear twice.
+    """
+    lines = text.split('\n')
+    counts = Counter(line.lower() for line in lines if line)
+    seen = set()
+    kept = []
+    for line in lines:
+        key = line.lower()
+        if not line:
+            kept.append(line)
+            continue
+        if _PAGE_NUMBER_RE.match(line):
+            continue
+        if key in seen and (counts[key] >= BOILERPLATE_MIN_REPEATS or len(line) > 40):
+            # Keep the first copy: a repeated header usually carries the candidate's name
+            continue
+        seen.add(key)
+        kept.append(line)
+    return normalize_whitespace('\n'.join(kept))
+
+
+def heading_section(line):
+    """
+    Return the section a heading line starts (e.g. 'experience'), or None if the line is not a heading.
+    """
+    match = _HEADING_RE.match(line)
+    if not match:
+        return None
+    return _HEADING_TO_SECTION.get(_SPACES_RE.sub(' ', match.group(1).strip().lower()))
+
+
+def split_sections(text):
+    """
+    Split a normalized resume into (section, text) pairs in document order.
+
+    Text before the first heading is the 'header' (name and contact details);
+    headings that are not recognised stay in the section they appear in.
+    """
+    sections = []
+    current, lines = 'header', []
+    for line in text.split('\n'):
+        section = heading_section(line)
+        if section is not None:
+            if any(lines):
+                sections.append((current, '\n'.join(lines).strip()))
+            current, lines = section, [line]
+        else:
+            lines.append(line)
+    if any(lines):
+        sections.append((current, '\n'.join(lines).strip()))
+    return sections
+
+
+def cut_tokens(text, budget):
+    """
+    Return the start of a text holding at most `budget` tokens (about four characters per token without tiktoken).
+    """
+    encoding = _get_encoding()
+    if encoding:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= budget else encoding.decode(tokens[:max(0, budget)])
+    return text[:max(0, budget) * 4]
+
+
+def _truncate(text, budget):
+    # Cut at a line boundary, keeping the heading and the most recent entries, which come first
+    lines = text.split('\n')
+    mark_cost = count_tokens(TRUNCATION_MARK) + 1
+    kept, used = [], mark_cost
+    for line in lines:
+        cost = count_tokens(line) + 1
+        if used + cost > budget:
+            if not kept:
+                # Not even the first line fits (e.g. text without line breaks): cut inside it
+                cut = cut_tokens(line, budget - mark_cost).rstrip()
+                kept = [cut] if cut else []
+            break
+        kept.append(line)
+        used += cost
+    return '\n'.join(kept + [TRUNCATION_MARK]) if kept else ''
+
+
+def _section_rank(section):
+    return SECTION_PRIORITY.index(section)
+
+
+def fit_to_budget(sections, budget):
+    """
+    Shorten (section, text) pairs so their total token count fits `budget`; return (sections, truncated).
+
+    Low-value sections (interests, references) are dropped first. The rest
+    share the budget evenly, what short sections do not need goes to the
+    longer ones, and sections over their share lose their last lines.
+    """
+    sized = [(section, text, count_tokens(text) + 1) for section, text in sections]
+    if sum(size for _, _, size in sized) <= budget:
+        return sections, False
+
+    sized = [item for item in sized if item[0] not in DROPPABLE_SECTIONS]
+    if sum(size for _, _, size in sized) <= budget:
+        return [(section, text) for section, text, _ in sized], True
+
+    allowance = {index: 0 for index in range(len(sized))}
+    remaining = budget
+    unfilled = set(allowance)
+    # Share the budget evenly, handing back what small sections do not use
+    while unfilled and remaining > len(unfilled):
+        share = remaining // len(unfilled)
+        for index in sorted(unfilled):
+            grant = min(share, sized[index][2] - allowance[index])
+            allowance[index] += grant
+            remaining -= grant
+            if allowance[index] >= sized[index][2]:
+                unfilled.discard(index)
+        if share == 0:
+            break
+    for index in sorted(unfilled, key=lambda index: _section_rank(sized[index][0])):
+        grant = min(remaining, sized[index][2] - allowance[index])
+        allowance[index] += grant
+        remaining -= grant
+
+    fitted = []
+    for index, (section, text, size) in enumerate(sized):
+        if allowance[index] >= size:
+            fitted.append((section, text))
+            continue
+        text = _truncate(text, allowance[index])
+        if text:
+            fitted.append((section, text))
+    return fitted, True
+
+
+def prepare_resume(resume_text, budget=None):
+    """
+    Normalize a resume for the screening prompts and bound its size; return a PreparedResume.
+
+    The original text is left untouched for display and storage; only the
+    returned text goes into the prompts.
+    """
+    budget = budget or TOKEN_BUDGET
+    original_tokens = count_tokens(resume_text)
+    if not NORMALIZE_ENABLED:
+        return PreparedResume(resume_text, original_tokens, original_tokens, [], False)
+
+    normalized = remove_boilerplate(normalize_whitespace(resume_text))
+    sections = split_sections(normalized)
+    sections, truncated = fit_to_budget(sections, budget)
+    text = '\n\n'.join(section_text for _, section_text in sections)
+    if normalized and not text:
+        # The budget is too small for any section; never send an empty resume
+        text = cut_tokens(normalized, budget)
+    return PreparedResume(text, original_tokens, count_tokens(text), [section for section, _ in sections], truncated)
+
+
+def cache_version(budget=None):
+    """
+    Return the part of the result cache key that depends on how resumes are prepared.
+    """
+    if not NORMALIZE_ENABLED:
+        return 'raw'
+    return f"{NORMALIZATION_VERSION}:{budget or TOKEN_BUDGET}"
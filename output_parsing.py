@@ -0,0 +1,262 @@
+import re
+import ast
+import json
+
+# Fields of one screening record, as stored in hr_resume_results
+RECORD_FIELDS = ('candidate_name', 'overall_score', 'tag', 'explanation', 'feedback')
+TAGS = ('QUALIFIED', 'NOT QUALIFIED', 'OVERQUALIFIED')
+QUALIFIED_SCORE = 75
+
+# Other spellings of the record fields seen in parser output
+_FIELD_ALIASES = {
+    'candidate_name': ('candidate_name', 'candidate', 'name', 'candidatename'),
+    'overall_score': ('overall_score', 'score', 'overallscore', 'total_score'),
+    'tag': ('tag', 'status', 'verdict', 'label'),
+    'explanation': ('explanation', 'explanation_of_score_awarded', 'reason', 'reasoning', 'score_explanation'),
+    'feedback': ('feedback', 'interview_questions', 'questions', 'comments'),
+}
+_KEY_TO_FIELD = {alias: field for field, aliases in _FIELD_ALIASES.items() for alias in aliases}
+
+_TAG_ALIASES = {
+    'QUALIFIED': 'QUALIFIED',
+    'NOT QUALIFIED': 'NOT QUALIFIED',
+    'UNQUALIFIED': 'NOT QUALIFIED',
+    'OVERQUALIFIED': 'OVERQUALIFIED',
+    'OVER QUALIFIED': 'OVERQUALIFIED',
+}
+
+_FENCE_RE = re.compile(r'^\s*```[\w-]*\s*$', re.M)
+_TRAILING_COMMA_RE = re.compile(r',\s*([\]}])')
+_UNQUOTED_KEY_RE = re.compile(r'([{,]\s*)([A-Za-z_][\w ]*?)(\s*:)')
+_LINE_COMMENT_RE = re.compile(r'^\s*//.*$', re.M)
+_ADJACENT_OBJECTS_RE = re.compile(r'}\s*,?\s*{')
+_NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?')
+_SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '‘': "'", '’': "'"})
+
+
+def _field(key):
+    return _KEY_TO_FIELD.get(re.sub(r'[\s\-]+', '_', str(key).strip().lower()))
+
+
+class OutputParseError(ValueError):
+    """
+    The parser output could not be turned into valid screening records, even after local repairs.
+    """
+
+
+def _json_span(text):
+    # The JSON value starts at the first bracket; prose before or after it is dropped
+    starts = [index for index in (text.find('['), text.find('{')) if index != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    end = max(text.rfind(']'), text.rfind('}'))
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def _close_brackets(text):
+    # Output cut short by the token limit: close the open string and brackets
+    stack, in_string, escaped = [], False, False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            stack.append(']' if char == '[' else '}')
+        elif char in ']}' and stack:
+            stack.pop()
+    return text + ('"' if in_string else '') + ''.join(reversed(stack))
+
+
+def _outside_strings(pattern, replacement):
+    # Apply a regex substitution only to the text between JSON strings, so string values are never rewritten
+    def repair(text):
+        parts, start, in_string, escaped = [], 0, False, False
+        for index, char in enumerate(text):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    parts.append(text[start:index + 1])
+                    start = index + 1
+            elif char == '"':
+                in_string = True
+                parts.append(pattern.sub(replacement, text[start:index]))
+                start = index
+        tail = text[start:]
+        # An unterminated string (output cut short) is left as it is
+        parts.append(tail if in_string else pattern.sub(replacement, tail))
+        return ''.join(parts)
+    return repair
+
+
+def _python_literal(text):
+    value = ast.literal_eval(text)
+    if not isinstance(value, (list, dict)):
+        raise ValueError("not a list or dict")
+    return value
+
+
+# Repairs tried in order, each on top of the previous ones
+_REPAIRS = (
+    ('surrounding_text', _json_span),
+    ('smart_quotes', lambda text: text.translate(_SMART_QUOTES)),
+    ('comments', lambda text: _LINE_COMMENT_RE.sub('', text)),
+    ('trailing_commas', _outside_strings(_TRAILING_COMMA_RE, r'\1')),
+    ('unquoted_keys', _outside_strings(_UNQUOTED_KEY_RE, r'\1"\2"\3')),
+    ('unclosed_brackets', _close_brackets),
+    ('concatenated_objects', lambda text: '[' + _ADJACENT_OBJECTS_RE.sub('},{', text) + ']' if text.lstrip().startswith('{') else text),
+)
+
+
+def load_json(text):
+    """
+    Parse JSON from LLM output, repairing common defects locally; return (value, repairs applied).
+
+    Handles prose around the JSON, smart quotes, comments,
+    trailing commas, unquoted keys, Python literals (single quotes, True/None),
+    output cut off mid-way and objects that are not wrapped in a list.
+    """
+    # Code fences are how models usually wrap JSON, so removing them does not count as a repair
+    text = _FENCE_RE.sub('', text or '').strip()
+    try:
+        return json.loads(text), []
+    except ValueError:
+        pass
+    applied = []
+    for name, repair in (('none', None),) + _REPAIRS:
+        if repair is not None:
+            repaired = repair(text)
+            if repaired == text:
+                continue
+            text = repaired
+            applied.append(name)
+            try:
+                return json.loads(text), applied
+            except ValueError:
+                pass
+        try:
+            return _python_literal(text), applied + ['python_literal']
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            pass
+    raise OutputParseError(f"Output is not valid JSON after repairs ({', '.join(applied) or 'none applied'}): {text[:200]!r}")
+
+
+def normalize_score(value):
+    """
+    Return a score (e.g. 85, "85", "85/100", "85%", 85.4) as an int between 0 and 100, or None.
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    else:
+        match = _NUMBER_RE.search(str(value or ''))
+        if not match:
+            return None
+        number = float(match.group())
+    return int(min(100, max(0, round(number))))
+
+
+def normalize_tag(value):
+    """
+    Return one of TAGS for a tag as the model spelled it, or None.
+    """
+    tag = re.sub(r'[\s_\-]+', ' ', str(value or '')).strip().strip("'\".").upper()
+    return _TAG_ALIASES.get(tag)
+
+
+def _text(value):
+    # Interview questions sometimes come back as a list
+    if isinstance(value, (list, tuple)):
+        return "\n".join(str(item) for item in value)
+    return '' if value is None else str(value).strip()
+
+
+def validate_record(record):
+    """
+    Check one parser record against the schema and return it normalized; return (record, repairs applied).
+
+    Keys are matched case-insensitively and through known aliases, the score
+    becomes an int from 0 to 100, and a missing or unknown tag is derived
+    from the score. Raises OutputParseError when there is no usable score.
+    """
+    if not isinstance(record, dict):
+        raise OutputParseError(f"Expected a record object, got {type(record).__name__}.")
+    applied = []
+    values = {}
+    for key, value in record.items():
+        field = _field(key)
+        if field and field not in values:
+            values[field] = value
+            if key != field:
+                applied.append('field_names')
+
+    score = normalize_score(values.get('overall_score'))
+    if score is None:
+        raise OutputParseError(f"Record has no usable overall_score: {record!r:.200}")
+    if not isinstance(values['overall_score'], int) or isinstance(values['overall_score'], bool):
+        applied.append('score')
+
+    tag = normalize_tag(values.get('tag'))
+    if tag is None:
+        tag = 'QUALIFIED' if score >= QUALIFIED_SCORE else 'NOT QUALIFIED'
+        applied.append('tag_from_score')
+    elif tag != values.get('tag'):
+        applied.append('tag')
+
+    normalized = {
+        'candidate_name': _text(values.get('candidate_name')) or 'Unknown Candidate',
+        'overall_score': score,
+        'tag': tag,
+        'explanation': _text(values.get('explanation')),
+        'feedback': _text(values.get('feedback')),
+    }
+    return normalized, sorted(set(applied))
+
+
+def parse_records(value):
+    """
+    Turn parser output (raw text or already decoded JSON) into a list of valid records; return (records, repairs).
+
+    Accepts a record, a list of records, nested lists, or an object wrapping
+    the list (e.g. {"results": [...]}).
+    """
+    applied = []
+    if isinstance(value, str):
+        value, applied = load_json(value)
+
+    if isinstance(value, dict) and not any(_field(key) for key in value):
+        # {"results": [...]} and similar wrappers
+        wrapped = [item for item in value.values() if isinstance(item, (list, dict))]
+        if len(wrapped) == 1:
+            value = wrapped[0]
+            applied.append('unwrapped')
+
+    items = value if isinstance(value, list) else [value]
+    flat = []
+    while items:
+        item = items.pop(0)
+        if isinstance(item, list):
+            items = item + items
+            applied.append('flattened')
+        else:
+            flat.append(item)
+    if not flat:
+        raise OutputParseError("Output holds no records.")
+
+    records = []
+    for item in flat:
+        record, record_repairs = validate_record(item)
+        records.append(record)
+        applied.extend(record_repairs)
+    return records, sorted(set(applied))
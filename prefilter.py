@@ -0,0 +1,170 @@
+import os
+import re
+import datetime
+
+# Bump when the rules change; it is part of the result cache key
+RULES_VERSION = 'rules-3'
+PREFILTER_ENABLED = os.getenv('PREFILTER_ENABLED', 'true').lower() == 'true'
+# Candidates this many years short of the minimum are rejected without an LLM call
+EXPERIENCE_TOLERANCE = float(os.getenv('PREFILTER_EXPERIENCE_TOLERANCE', '1'))
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_MONTH = r'(?:(jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s*|(\d{1,2})\s*[/\-.]\s*)?'
+_DATE_RANGE_RE = re.compile(
+    _MONTH + r'((?:19|20)\d{2})\s*(?:-|–|—|to|till|until)\s*'
+    r'(?:' + _MONTH + r'((?:19|20)\d{2})|(present|current|now|date|today))',
+    re.I
+)
+_EXPLICIT_YEARS_RE = re.compile(
+    r'(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\s*(?:of\s*)?(?:\w+\s+){0,3}?(?:experience|exp\b)',
+    re.I
+)
+
+# Words that end a job title; prefixes are picked up from the words right before them
+_TITLE_NOUNS = (
+    'engineer', 'developer', 'analyst', 'manager', 'scientist', 'consultant', 'designer', 'architect',
+    'administrator', 'specialist', 'intern', 'lead', 'tester', 'associate', 'executive', 'officer',
+    'accountant', 'recruiter', 'programmer', 'director', 'coordinator', 'technician', 'head',
+)
+_TITLE_RE = re.compile(
+    r'((?:[A-Za-z][A-Za-z/&+.#-]*[ \t]+){0,3}(?:' + '|'.join(_TITLE_NOUNS) + r')s?)\b',
+    re.I
+)
+_SENIORITY_WORDS = {
+    'senior', 'sr', 'junior', 'jr', 'lead', 'principal', 'staff', 'trainee', 'intern', 'associate',
+    'assistant', 'chief', 'head', 'i', 'ii', 'iii', 'iv', 'a', 'an', 'the', 'and', 'as', 'of', 'worked',
+}
+_NAME_RE = re.compile(r"^(?:name\s*[:\-]\s*)?([A-Z][a-zA-Z.'-]+(?:\s+[A-Z][a-zA-Z.'-]+){1,3})\s*$")
+
+
+def _title_tokens(title):
+    tokens = re.findall(r'[a-z0-9+#]+', title.lower())
+    return {token.rstrip('s') for token in tokens if token not in _SENIORITY_WORDS}
+
+
+def extract_years_of_experience(text):
+    """
+    Estimate the candidate's years of professional experience from a resume.
+
+    Takes the larger of the explicit statements ("5+ years of experience")
+    and the merged, summed employment date ranges: a statement may be about
+    one skill ("2 years of experience with Kubernetes"), and ranges may be
+    missing, so the lower figure is never trusted on its own.
+    """
+    explicit = [float(match.group(1)) for match in _EXPLICIT_YEARS_RE.finditer(text)]
+    explicit = [years for years in explicit if years <= 50]
+    estimates = [years for years in (max(explicit, default=None), _dated_years(text)) if years is not None]
+    return max(estimates, default=None)
+
+
+def _dated_years(text):
+    # Sum of the employment date ranges, with overlaps merged
+    today = datetime.date.today()
+    intervals = []
+    for match in _DATE_RANGE_RE.finditer(text):
+        start_month = _MONTHS.get((match.group(1) or '')[:3].lower()) or int(match.group(2) or 1)
+        start = int(match.group(3)) + (min(max(start_month, 1), 12) - 1) / 12
+        if match.group(7):
+            end = today.year + (today.month - 1) / 12
+        else:
+            end_month = _MONTHS.get((match.group(4) or '')[:3].lower()) or int(match.group(5) or 12)
+            end = int(match.group(6)) + (min(max(end_month, 1), 12) - 1) / 12
+        if start <= end <= today.year + 1:
+            intervals.append((start, end))
+    if not intervals:
+        return None
+
+    # Merge overlapping ranges so parallel roles are not counted twice
+    intervals.sort()
+    total = 0.0
+    current_start, current_end = intervals[0]
+    for start, end in intervals[1:]:
+        if start <= current_end:
+            current_end = max(current_end, end)
+        else:
+            total += current_end - current_start
+            current_start, current_end = start, end
+    total += current_end - current_start
+    return round(total, 1)
+
+
+def extract_job_titles(text):
+    """
+    Return the job titles mentioned in a resume, in order of appearance.
+    """
+    titles = []
+    seen = set()
+    for match in _TITLE_RE.finditer(text):
+        title = ' '.join(match.group(1).split())
+        key = title.lower()
+        if key not in seen:
+            seen.add(key)
+            titles.append(title)
+    return titles
+
+
+def title_matches(required_title, titles):
+    """
+    Check whether any past title contains every core word of the required title.
+    """
+    required = _title_tokens(required_title)
+    if not required:
+        return True
+    return any(required <= _title_tokens(title) for title in titles)
+
+
+def guess_candidate_name(text):
+    """
+    Take the candidate's name from the first lines of a resume, if it looks like one.
+    """
+    for line in text.strip().splitlines()[:5]:
+        match = _NAME_RE.match(line.strip())
+        if match:
+            return match.group(1)
+    return "Unknown"
+
+
+def prefilter_resume(resume_text, job_profile):
+    """
+    Apply the mechanical evaluation rules locally before any LLM call.
+
+    Returns a rule-based result record (in the parser's list-of-records shape)
+    for clear mismatches, or None when the resume has to go to the crew.
+    Rules only reject when both the requirement and the candidate's value
+    could be read reliably.
+    """
+    if not PREFILTER_ENABLED:
+        return None
+
+    reasons = []
+    score = None
+
+    min_years = job_profile.get('min_years')
+    years = extract_years_of_experience(resume_text)
+    if min_years is not None and years is not None and years < min_years - EXPERIENCE_TOLERANCE:
+        reasons.append(f"The candidate has about {years:g} years of experience, below the required minimum of {min_years:g} years.")
+        score = 15
+
+    # Guessed titles (first line of the job description, "we are looking for a ...") are not reliable enough to reject on
+    required_title = job_profile.get('required_title') if job_profile.get('title_source') == 'explicit' else None
+    if required_title:
+        titles = extract_job_titles(resume_text)
+        # Only a clear mismatch when the required title words do not even appear in the resume
+        if titles and not title_matches(required_title, titles) and not _title_tokens(required_title) <= _title_tokens(resume_text):
+            reasons.append(
+                f"None of the candidate's previous titles ({', '.join(titles[:5])}) match the required job title '{required_title}'."
+            )
+            score = min(score or 35, 35)
+
+    if not reasons:
+        return None
+    return [{
+        'candidate_name': guess_candidate_name(resume_text),
+        'overall_score': score,
+        'tag': 'NOT QUALIFIED',
+        'explanation': "Rule-based screening: " + " ".join(reasons),
+        'feedback': 'Not suitable resume',
+    }]
@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from contextlib import closing
+
+from storage import connect
+
+CACHE_DB = 'result_cache.sqlite3'
+CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', str(30 * 24 * 3600)))
+CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '10000'))
+
+_stats = {'hits': 0, 'misses': 0, 'near_duplicate_hits': 0, 'stores': 0, 'evictions': 0}
+_stats_lock = threading.Lock()
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def text_hash(text):
+    """
+    Return the SHA-256 hex digest of a text.
+    """
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def cache_key(resume_text, job_description, prompt_version):
+    """
+    Build the content address of a screening result.
+    """
+    return _hash_key(text_hash(resume_text), job_description, prompt_version)
+
+
+def _hash_key(resume_hash, job_description, prompt_version):
+    return text_hash(f"{resume_hash}:{text_hash(job_description)}:{prompt_version}")
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def _init_cache(conn):
+    # Create the table once per process. Entries of other prompt versions are left alone: the version is
+    # part of every key, several versions are valid at once (one per mode and settings), and stale ones
+    # age out through the TTL and LRU eviction in store_result.
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS screening_cache (
+                key TEXT PRIMARY KEY,
+                prompt_version TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_screening_cache_accessed ON screening_cache (accessed_at);
+        """)
+        _initialized = True
+
+
+def _lookup(conn, key, now):
+    # Return a fresh cached result and mark it as used, dropping it if expired
+    row = conn.execute("SELECT result, created_at FROM screening_cache WHERE key = ?", (key,)).fetchone()
+    if row is not None and row['created_at'] < now - CACHE_TTL:
+        conn.execute("DELETE FROM screening_cache WHERE key = ?", (key,))
+        _count('evictions')
+        row = None
+    if row is None:
+        return None
+    conn.execute("UPDATE screening_cache SET accessed_at = ? WHERE key = ?", (now, key))
+    return json.loads(row['result'])
+
+
+def get_cached_result(resume_text, job_description, prompt_version):
+    """
+    Return the cached screening result for this resume, job description and prompt version, or None.
+    """
+    if not CACHE_ENABLED:
+        return None
+    key = cache_key(resume_text, job_description, prompt_version)
+    with closing(connect(CACHE_DB)) as conn:
+        _init_cache(conn)
+        result = _lookup(conn, key, time.time())
+    _count('misses' if result is None else 'hits')
+    return result
+
+
+def get_near_duplicate_result(resume_hashes, job_description, prompt_version):
+    """
+    Return (resume hash, cached result) for the first of `resume_hashes` screened against this job description, or None.
+
+    Used with near-duplicates of a resume (see dedupe.py), best match first.
+    """
+    if not CACHE_ENABLED or not resume_hashes:
+        return None
+    now = time.time()
+    with closing(connect(CACHE_DB)) as conn:
+        _init_cache(conn)
+        for resume_hash in resume_hashes:
+            result = _lookup(conn, _hash_key(resume_hash, job_description, prompt_version), now)
+            if result is not None:
+                _count('near_duplicate_hits')
+                return resume_hash, result
+    return None
+
+
+def store_result(resume_text, job_description, prompt_version, result):
+    """
+    Cache a screening result and evict the least recently used entries over the size limit.
+    """
+    if not CACHE_ENABLED:
+        return
+    key = cache_key(resume_text, job_description, prompt_version)
+    now = time.time()
+    with closing(connect(CACHE_DB)) as conn:
+        _init_cache(conn)
+        conn.execute(
+            "INSERT OR REPLACE INTO screening_cache (key, prompt_version, result, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, prompt_version, json.dumps(result), now, now)
+        )
+        evicted = conn.execute(
+            "DELETE FROM screening_cache WHERE created_at < ? OR key IN ("
+            "SELECT key FROM screening_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (now - CACHE_TTL, CACHE_MAX_ENTRIES)
+        ).rowcount
+    _count('stores')
+    if evicted:
+        _count('evictions', evicted)
+
+
+def cache_stats():
+    """
+    Return the hit/miss counters of this process together with the hit ratio.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    return stats
@@ -0,0 +1,258 @@
+import os
+import time
+import random
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from new_test import PIPELINES, DEFAULT_MODE, prompt_version as pipeline_prompt_version
+import result_cache
+from result_cache import get_cached_result, get_near_duplicate_result, store_result
+from jd_store import get_job_profile, PROFILE_VERSION
+from prefilter import prefilter_resume, PREFILTER_ENABLED, RULES_VERSION
+from normalization import prepare_resume, cache_version
+from output_parsing import parse_records, OutputParseError
+import dedupe
+import metrics
+
+# Screening concurrency and rate limit configuration
+MAX_WORKERS = int(os.getenv('SCREENING_MAX_WORKERS', '4'))
+MAX_RETRIES = int(os.getenv('SCREENING_MAX_RETRIES', '5'))
+BACKOFF_BASE = float(os.getenv('SCREENING_BACKOFF_BASE', '2'))
+BACKOFF_MAX = float(os.getenv('SCREENING_BACKOFF_MAX', '60'))
+# Times the final (parser) task alone is re-run when its output cannot be repaired
+PARSER_MAX_RETRIES = int(os.getenv('PARSER_MAX_RETRIES', '2'))
+
+# `span` holds the timings and token usage of the screening, see metrics.py;
+# `duplicate_of` is the index of the resume of the same batch whose result was reused
+ScreeningOutcome = namedtuple('ScreeningOutcome', ['filename', 'result', 'error', 'span', 'duplicate_of'],
+                              defaults=(None, None))
+
+# Every worker thread keeps its own crews so task outputs are never shared
+_local = threading.local()
+
+
+def get_worker_crew(mode=DEFAULT_MODE):
+    """
+    Return the crew for a screening mode owned by the calling thread, building it on first use.
+    """
+    crews = getattr(_local, 'crews', None)
+    if crews is None:
+        crews = _local.crews = {}
+    if mode not in crews:
+        crews[mode] = PIPELINES[mode]()
+    return crews[mode]
+
+
+def is_rate_limit_error(exc):
+    """
+    Check whether an exception (or anything it wraps) is an OpenAI rate limit error.
+    """
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        if 'RateLimit' in type(exc).__name__ or getattr(exc, 'status_code', None) == 429:
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def kickoff_with_backoff(crew, inputs, span=None):
+    """
+    Run a crew, retrying with exponential backoff and jitter when rate limited.
+
+    Retries are counted on `span` when given.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        # Worker crews are reused, and a skipped ConditionalTask keeps its output from the
+        # previous resume, which would otherwise reach the editor as this candidate's questions
+        for task in crew.tasks:
+            task.output = None
+        try:
+            return crew.kickoff(inputs=inputs)
+        except Exception as e:
+            if attempt == MAX_RETRIES or not is_rate_limit_error(e):
+                raise
+            if span is not None:
+                span['retries'] += 1
+            delay = min(BACKOFF_MAX, BACKOFF_BASE ** attempt) * (1 + random.random())
+            logging.warning(f"Rate limited by OpenAI, retrying in {delay:.1f}s (attempt {attempt + 1}/{MAX_RETRIES})")
+            time.sleep(delay)
+
+
+def _task_context(task):
+    # What the crew passed to the task: the raw outputs of the tasks it depends on
+    if not isinstance(task.context, list):
+        return ''
+    from crewai.utilities.formatter import aggregate_raw_outputs_from_tasks
+    return aggregate_raw_outputs_from_tasks(task.context)
+
+
+def read_crew_result(crew, mode=DEFAULT_MODE, span=None):
+    """
+    Return the validated list of result records produced by the last run of a crew.
+
+    Malformed output is repaired locally when possible. Otherwise only the
+    final (parser) task runs again, told what was wrong, up to
+    PARSER_MAX_RETRIES times; the earlier, expensive tasks are not repeated.
+    Raises OutputParseError when every attempt fails.
+    """
+    final_task = crew.tasks[-1]
+    output = final_task.output
+    retries = 0
+    while True:
+        try:
+            # The fast mode's structured output arrives as json_dict; raw text otherwise
+            records, repairs = parse_records(output.json_dict or output.raw)
+            break
+        except OutputParseError as e:
+            metrics.inc('hr_output_parse_failures_total', mode=mode, task=final_task.name)
+            if retries == PARSER_MAX_RETRIES:
+                raise
+            retries += 1
+            metrics.inc('hr_output_parser_retries_total', mode=mode, task=final_task.name)
+            logging.warning(f"Unusable {final_task.name} output ({e}); re-running it (attempt {retries}/{PARSER_MAX_RETRIES})")
+            correction = f"Your previous answer could not be used: {e}\nReply with only the JSON described above."
+            context = "\n\n".join(part for part in (_task_context(final_task), correction) if part)
+            output = final_task.execute_sync(agent=final_task.agent, context=context)
+
+    for repair in repairs:
+        metrics.inc('hr_output_repairs_total', mode=mode, repair=repair)
+    if span is not None:
+        span['parse'] = {'repairs': repairs, 'retries': retries}
+    return records
+
+
+def _store_result(resume_text, job_description, prompt_version, result, signature):
+    # Cache a screened result and index the resume so its near-duplicates can find it
+    store_result(resume_text, job_description, prompt_version, result)
+    if signature is not None:
+        dedupe.remember(resume_text, signature)
+
+
+def screen_resume(resume_text, job_description, mode=None):
+    """
+    Screen a single resume on the calling thread's crew and return the parsed parser output.
+
+    Results are served from the result cache when the same resume, or a near
+    duplicate of it, was already screened against the same job description with
+    the current prompts, and clear mismatches are answered by the local
+    pre-filter rules.
+    """
+    return screen_resume_traced(resume_text, job_description, mode)[0]
+
+
+def screen_resume_traced(resume_text, job_description, mode=None):
+    """
+    Like `screen_resume`, but return (result, span) with the per-task timings and token usage.
+    """
+    mode = mode or DEFAULT_MODE
+    span = metrics.new_span(mode)
+    try:
+        # The prompts see the normalized resume and the compact job profile, so how both are prepared is part of the cache key
+        prompt_version = f"{pipeline_prompt_version(mode)}:{cache_version()}:jd-{PROFILE_VERSION}"
+        if PREFILTER_ENABLED:
+            # The rules decide which resumes reach the crew, so they are part of the cache key
+            prompt_version = f"{prompt_version}:{RULES_VERSION}"
+        cached = get_cached_result(resume_text, job_description, prompt_version)
+        if cached is not None:
+            return cached, metrics.finish_span(span, 'cached')
+
+        # A slightly different version of a CV screened before reuses that screening
+        signature = dedupe.signature(resume_text) if result_cache.CACHE_ENABLED else None
+        near = get_near_duplicate_result(
+            [resume_hash for resume_hash, _ in dedupe.similar_resumes(signature)], job_description, prompt_version
+        )
+        if near is not None:
+            span['duplicate_of'] = near[0]
+            # Cached under this exact text too, but not indexed, so matches never drift from the screened original
+            store_result(resume_text, job_description, prompt_version, near[1])
+            return near[1], metrics.finish_span(span, 'near_duplicate')
+
+        # Clear mismatches are rejected by local rules without any LLM call; they read the full text
+        job_artifact = get_job_profile(job_description)
+        result = prefilter_resume(resume_text, job_artifact['profile'])
+        if result is not None:
+            _store_result(resume_text, job_description, prompt_version, result, signature)
+            return result, metrics.finish_span(span, 'prefiltered')
+
+        # Whitespace, repeated headers and low-value sections are stripped and the rest fit to the token budget
+        prepared = prepare_resume(resume_text)
+        span['resume_tokens'] = {'original': prepared.original_tokens, 'prompt': prepared.tokens,
+                                 'truncated': prepared.truncated}
+
+        # The prompts get the compact requirements parsed once per job description, not the full text
+        job_profile = job_artifact['compact']
+        crew = get_worker_crew(mode)
+        with metrics.CrewSpan(crew) as crew_span:
+            try:
+                kickoff_with_backoff(crew, {
+                    "resume": prepared.text,
+                    "job_profile": job_profile
+                }, span)
+                # Parser retries happen here, so their tokens count towards this resume
+                result = read_crew_result(crew, mode, span)
+            finally:
+                span['tasks'] = crew_span.tasks()
+        _store_result(resume_text, job_description, prompt_version, result, signature)
+        return result, metrics.finish_span(span, 'llm')
+    except Exception as e:
+        # The span travels with the exception so failed screenings are reported too
+        e.screening_span = metrics.finish_span(span, 'error')
+        raise
+
+
+def _screen_one(filename, resume_text, job_description, mode):
+    try:
+        result, span = screen_resume_traced(resume_text, job_description, mode)
+        return ScreeningOutcome(filename, result, None, span)
+    except OutputParseError as e:
+        logging.warning(f"Failed to parse screening output for {filename}: {e}")
+        return ScreeningOutcome(filename, None, e, getattr(e, 'screening_span', None))
+    except Exception as e:
+        logging.error(f"Error processing {filename}: {e}")
+        return ScreeningOutcome(filename, None, e, getattr(e, 'screening_span', None))
+
+
+def screen_resumes(resumes, job_description, max_workers=None, on_result=None, mode=None):
+    """
+    Screen several resumes concurrently against one job description.
+
+    `resumes` is a list of (filename, resume_text) pairs. The returned list of
+    ScreeningOutcome holds one entry per resume in the same order as the input.
+    `on_result(index, outcome)` is called from the worker thread as soon as a
+    resume finishes. `mode` selects the 'full' crew or the 'fast' single-pass screener.
+    Near-duplicates within the batch are screened once; the others get the same
+    outcome with `duplicate_of` set, as soon as the first one finishes.
+    """
+    duplicate_of = dedupe.group_duplicates([resume_text for _, resume_text in resumes])
+    copies = {}
+    for index, first in enumerate(duplicate_of):
+        if first is not None:
+            copies.setdefault(first, []).append(index)
+    outcomes = [None] * len(resumes)
+
+    def finish(index, outcome):
+        outcomes[index] = outcome
+        if on_result is not None:
+            on_result(index, outcome)
+
+    def run(index, filename, resume_text):
+        outcome = _screen_one(filename, resume_text, job_description, mode)
+        finish(index, outcome)
+        for copy in copies.get(index, ()):
+            span = metrics.new_span(mode or DEFAULT_MODE)
+            span['duplicate_of'] = filename
+            finish(copy, ScreeningOutcome(resumes[copy][0], outcome.result, outcome.error,
+                                          metrics.finish_span(span, 'duplicate'), index))
+
+    originals = [index for index, first in enumerate(duplicate_of) if first is None]
+    if copies:
+        logging.info(f"{len(resumes) - len(originals)} near-duplicate resumes reuse the screening of {len(copies)} others")
+    max_workers = max(1, min(max_workers or MAX_WORKERS, len(originals) or 1))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='screening') as executor:
+        futures = [executor.submit(run, index, *resumes[index]) for index in originals]
+        for future in futures:
+            future.result()
+    return outcomes
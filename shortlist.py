@@ -0,0 +1,229 @@
+import os
+import re
+import time
+import zlib
+import logging
+import threading
+from contextlib import closing
+from collections import namedtuple
+
+import numpy as np
+
+from storage import connect
+from result_cache import text_hash
+
+# Screen only the N resumes closest to the job description; 0 screens everyone
+SHORTLIST_TOP_N = int(os.getenv('SHORTLIST_TOP_N', '0'))
+# Local sentence-transformers model (name or path); TF-IDF over hashed terms when unset or unavailable
+SHORTLIST_MODEL = os.getenv('SHORTLIST_MODEL', '')
+HASH_DIM = int(os.getenv('SHORTLIST_HASH_DIM', '4096'))
+# Vectors kept on disk per backend, most recent first
+INDEX_MAX_ROWS = int(os.getenv('SHORTLIST_INDEX_MAX_ROWS', '50000'))
+
+INDEX_DB = 'shortlist.sqlite3'
+# Resume hashes looked up per query, below SQLite's limit on bound parameters
+_QUERY_CHUNK = 500
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+Shortlist = namedtuple('Shortlist', ['selected', 'scores', 'backend'])
+
+_model = None
+_model_lock = threading.Lock()
+_initialized = False
+_init_lock = threading.Lock()
+
+
+def _load_model():
+    # Loaded once per process; False means the TF-IDF fallback is used
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = False
+            if SHORTLIST_MODEL:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _model = SentenceTransformer(SHORTLIST_MODEL, device='cpu')
+                except Exception as e:
+                    logging.warning(f"Embedding model {SHORTLIST_MODEL} unavailable ({e}); shortlisting with TF-IDF.")
+        return _model
+
+
+def backend_name():
+    """
+    Return the name of the vectorizer in use; vectors from different backends never mix in the index.
+    """
+    if _load_model():
+        return 'embedding-' + re.sub(r'[^A-Za-z0-9_.-]+', '_', SHORTLIST_MODEL)
+    return f"tfidf-{HASH_DIM}"
+
+
+def tokenize(text):
+    """
+    Return the lowercase words and adjacent word pairs of a text.
+    """
+    words = _WORD_RE.findall((text or '').lower())
+    return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def term_counts(text):
+    """
+    Return the term counts of a text hashed into a HASH_DIM vector.
+    """
+    # crc32 is stable across processes, unlike hash(), so stored vectors stay valid
+    buckets = np.fromiter((zlib.crc32(term.encode('utf-8')) for term in tokenize(text)), dtype=np.uint32)
+    return np.bincount(buckets % HASH_DIM, minlength=HASH_DIM).astype(np.float32)
+
+
+def _vectorize(texts):
+    model = _load_model()
+    if model:
+        return np.asarray(model.encode(list(texts), normalize_embeddings=True, batch_size=32), dtype=np.float32)
+    if not texts:
+        return np.zeros((0, HASH_DIM), dtype=np.float32)
+    return np.stack([term_counts(text) for text in texts])
+
+
+def _init_index(conn):
+    global _initialized
+    with _init_lock:
+        if _initialized:
+            return
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS shortlist_vectors (
+                backend TEXT NOT NULL,
+                resume_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                seen_at REAL NOT NULL,
+                PRIMARY KEY (backend, resume_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_shortlist_vectors_seen ON shortlist_vectors (backend, seen_at);
+        """)
+        _initialized = True
+
+
+def _encode(backend, vector):
+    # Term counts are mostly zeros, so TF-IDF rows keep only their non-zero buckets
+    if backend.startswith('tfidf'):
+        buckets = np.flatnonzero(vector).astype(np.uint32)
+        return buckets.tobytes() + vector[buckets].astype(np.float32).tobytes()
+    return vector.astype(np.float32).tobytes()
+
+
+def _decode(backend, blob, dim):
+    if backend.startswith('tfidf'):
+        half = len(blob) // 2
+        vector = np.zeros(dim, dtype=np.float32)
+        vector[np.frombuffer(blob[:half], dtype=np.uint32)] = np.frombuffer(blob[half:], dtype=np.float32)
+        return vector
+    return np.frombuffer(blob, dtype=np.float32)
+
+
+def _load_vectors(conn, backend, hashes):
+    # Stored vectors of the given resumes, by resume hash
+    stored = {}
+    dim = HASH_DIM if backend.startswith('tfidf') else None
+    for start in range(0, len(hashes), _QUERY_CHUNK):
+        chunk = hashes[start:start + _QUERY_CHUNK]
+        for row in conn.execute(
+            "SELECT resume_hash, vector FROM shortlist_vectors "
+            f"WHERE backend = ? AND resume_hash IN ({', '.join('?' * len(chunk))})",
+            [backend] + chunk
+        ):
+            stored[row['resume_hash']] = _decode(backend, row['vector'], dim)
+    return stored
+
+
+def _save_vectors(conn, backend, new_vectors, known):
+    # New rows are added and reused ones touched in one transaction, so concurrent workers never see a partial index
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany(
+            "INSERT OR REPLACE INTO shortlist_vectors (backend, resume_hash, vector, seen_at) VALUES (?, ?, ?, ?)",
+            [(backend, key, _encode(backend, vector), now) for key, vector in new_vectors.items()]
+        )
+        conn.executemany(
+            "UPDATE shortlist_vectors SET seen_at = ? WHERE backend = ? AND resume_hash = ?",
+            [(now, backend, key) for key in known]
+        )
+        # Trimming keeps the resumes used most recently
+        stale = conn.execute(
+            "DELETE FROM shortlist_vectors WHERE backend = ? AND resume_hash IN ("
+            "SELECT resume_hash FROM shortlist_vectors WHERE backend = ? ORDER BY seen_at DESC LIMIT -1 OFFSET ?)",
+            (backend, backend, INDEX_MAX_ROWS)
+        ).rowcount
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    return stale
+
+
+def resume_vectors(texts):
+    """
+    Return one vector per resume text, reusing those stored in the on-disk index.
+
+    For TF-IDF the stored vectors are raw term counts, so they stay valid for
+    any job description and applicant pool.
+    """
+    backend = backend_name()
+    hashes = [text_hash(text) for text in texts]
+    texts_by_hash = dict(zip(hashes, texts))
+    unique = list(texts_by_hash)
+    with closing(connect(INDEX_DB)) as conn:
+        _init_index(conn)
+        stored = _load_vectors(conn, backend, unique)
+        unknown = [key for key in unique if key not in stored]
+        new_vectors = dict(zip(unknown, _vectorize([texts_by_hash[key] for key in unknown]))) if unknown else {}
+        stale = _save_vectors(conn, backend, new_vectors, list(stored))
+    if unknown:
+        logging.info(f"Shortlist index {backend}: {len(unknown)} new resumes, {stale} dropped.")
+
+    vectors = {**stored, **new_vectors}
+    return np.stack([vectors[key] for key in hashes])
+
+
+def _tfidf(counts, query_counts):
+    # Log-scaled term frequencies weighted by the inverse document frequency of the pool
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(counts)) / (1 + document_frequency)) + 1
+    documents = np.log1p(counts) * idf
+    query = np.log1p(query_counts) * idf
+    return documents, query
+
+
+def top_k(scores, k):
+    """
+    Return the indices of the `k` highest scores, best first, ties broken by position.
+    """
+    if k >= len(scores):
+        return list(np.lexsort((np.arange(len(scores)), -scores)))
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return list(candidates[np.lexsort((candidates, -scores[candidates]))])
+
+
+def rank(documents, job_description, top_n):
+    """
+    Rank resume vectors from `resume_vectors` by cosine similarity to a job description; return a Shortlist.
+
+    `selected` holds the indices of the best `top_n` resumes, best first;
+    `scores` the similarity of every resume.
+    """
+    query = _vectorize([job_description])[0]
+    backend = backend_name()
+    if backend.startswith('tfidf'):
+        documents, query = _tfidf(documents, query)
+    # Cosine similarity of every resume at once
+    norms = np.linalg.norm(documents, axis=1) * (np.linalg.norm(query) or 1.0)
+    scores = (documents @ query) / np.where(norms == 0, 1.0, norms)
+    return Shortlist([int(index) for index in top_k(scores, top_n)], scores, backend)
+
+
+def shortlist(texts, job_description, top_n=None):
+    """
+    Return the Shortlist of the `top_n` resume texts closest to a job description (default SHORTLIST_TOP_N).
+    """
+    if not texts:
+        return Shortlist([], np.zeros(0, dtype=np.float32), backend_name())
+    return rank(resume_vectors(texts), job_description, top_n or SHORTLIST_TOP_N or len(texts))
@@ -0,0 +1,34 @@
+import os
+import time
+import sqlite3
+
+# Local state (job queue, caches, indexes) lives under one data directory
+DATA_DIR = os.getenv('HR_DATA_DIR', 'data')
+
+
+def data_path(*parts):
+    """
+    Return a path inside the data directory, creating parent folders as needed.
+    """
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return path
+
+
+def connect(name):
+    """
+    Open a SQLite database in the data directory, set up for concurrent readers and writers.
+    """
+    conn = sqlite3.connect(data_path(name), timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # Switching a new database to WAL does not wait for the busy timeout, so processes opening it together retry
+    for attempt in range(50):
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            break
+        except sqlite3.OperationalError as e:
+            if 'locked' not in str(e) or attempt == 49:
+                raise
+            time.sleep(0.1)
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,82 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+
+# Uploads kept on disk (e.g. a retained job description) are removed after this many seconds unused
+RETENTION_SECONDS = float(os.getenv('UPLOAD_RETENTION_SECONDS', str(7 * 24 * 3600)))
+SWEEP_INTERVAL = float(os.getenv('UPLOAD_SWEEP_INTERVAL', '3600'))
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def store_upload(data, filename, upload_folder):
+    """
+    Persist uploaded bytes once under their content hash and return the path.
+
+    Identical uploads share one file and different files never overwrite each
+    other, whatever name they were uploaded under.
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    path = os.path.join(upload_folder, hashlib.sha256(data).hexdigest() + extension)
+    if os.path.exists(path):
+        touch_upload(path)
+        return path
+
+    # Write to a temporary name first so readers never see a partial file
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    logging.info(f"Upload {filename} stored at: {path}")
+    return path
+
+
+def touch_upload(path):
+    """
+    Mark a stored upload as recently used so the retention sweeper keeps it.
+    """
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def sweep_uploads(upload_folder, max_age=None):
+    """
+    Delete stored uploads that have not been used for `max_age` seconds and return how many were removed.
+    """
+    cutoff = time.time() - (max_age if max_age is not None else RETENTION_SECONDS)
+    removed = 0
+    for entry in os.scandir(upload_folder):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except OSError as e:
+            logging.warning(f"Could not remove old upload {entry.path}: {e}")
+    if removed:
+        logging.info(f"Removed {removed} uploads older than the retention period from {upload_folder}.")
+    return removed
+
+
+def _sweep_loop(upload_folder):
+    while True:
+        try:
+            sweep_uploads(upload_folder)
+        except Exception as e:
+            logging.error(f"Upload sweeper error: {e}", exc_info=True)
+        time.sleep(SWEEP_INTERVAL)
+
+
+def start_sweeper(upload_folder):
+    """
+    Start the background thread (once per process) that applies the upload retention period.
+    """
+    global _sweeper
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep_loop, args=(upload_folder,), name='upload-sweeper', daemon=True)
+            _sweeper.start()